@@ -0,0 +1,197 @@
+"""Общий кэш текстур игры: ключ — путь к файлу (обычно внутри ASSETS_DIR), бюджет памяти и LRU.
+
+Декодирование PNG и расчёт хитбокса делаются без GL, поэтому preload() выполняет их
+в фоновом потоке; в видеопамять текстура попадает при первой отрисовке, как и раньше.
+
+Если рядом с собранной игрой лежит архив ассетов (см. bundle.py), файлы читаются
+из него, а не с диска; пути остаются прежними — абсолютными путями в папке игры.
+
+Тайлы уровней и спрайты персонажей вырезаются из атласа текстур (см. atlas.py):
+один PNG декодируется один раз вместо десятка файлов; остальные картинки атлас
+не трогают, поэтому заставка не ждёт его сборки. Если рядом с картинкой лежит
+<имя>.hitbox.json (уменьшенные спрайты, см. sprites.py), хитбокс берётся из него.
+"""
+import io
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+
+from atlas import may_contain
+from bundle import bundle_key, find_bundle
+from sprites import hit_box_path
+
+BASE_DIR = Path(__file__).resolve().parent
+ASSETS_DIR = BASE_DIR / "assets"
+DEFAULT_BUDGET = 128 * 1024 * 1024   # байт несжатых RGBA-пикселей
+
+bundle = find_bundle()
+
+
+def resolve(path) -> Path:
+    """'assets/bg.png', 'bg.png' или абсолютный путь -> абсолютный путь к файлу."""
+    return _resolve(str(path))
+
+
+@lru_cache(maxsize=4096)
+def _resolve(path: str) -> Path:
+    # Path.resolve() ходит в файловую систему, а тайлы чанков спрашивают одни и те же пути
+    path = Path(path)
+    if not path.is_absolute():
+        from_base = BASE_DIR / path
+        in_bundle = bundle is not None and path.as_posix() in bundle
+        path = from_base if in_bundle or from_base.exists() else ASSETS_DIR / path
+    return path.resolve()
+
+
+def read_bundled(path):
+    """Содержимое файла из архива ассетов (memoryview) или None, если архива нет или файла в нём нет."""
+    if bundle is None:
+        return None
+    key = bundle_key(path, BASE_DIR)
+    return bundle.get(key) if key is not None else None
+
+
+def load_sound(path, streaming: bool = False):
+    """arcade.Sound из файла или из архива ассетов."""
+    import arcade
+
+    key = resolve(path)
+    data = read_bundled(key)
+    if data is None:
+        return arcade.Sound(key, streaming=streaming)
+    from pyglet import media
+
+    # arcade.Sound умеет только пути к файлам — собираем тот же объект вокруг источника из памяти
+    sound = arcade.Sound.__new__(arcade.Sound)
+    sound.file_name = str(key)
+    sound.source = media.load(key.name, file=io.BytesIO(data), streaming=streaming)
+    sound.min_distance = 100000000
+    return sound
+
+
+def read_hit_box(path):
+    """Точки хитбокса из <картинка>.hitbox.json (с диска или из архива) или None."""
+    sidecar = hit_box_path(path)
+    data = read_bundled(sidecar)
+    try:
+        data = sidecar.read_bytes() if data is None else bytes(data)
+    except OSError:
+        return None
+    return tuple(tuple(point) for point in json.loads(data)["points"])
+
+
+class TextureCache:
+    """Текстуры по пути файла. При превышении бюджета вытесняются давно не использованные."""
+
+    def __init__(self, budget: int = DEFAULT_BUDGET):
+        self.budget = budget
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()   # путь -> (texture, размер в байтах)
+        self._loading = {}            # путь -> threading.Event, пока грузится в фоне
+        self._lock = threading.Lock()
+        self._atlas = None
+        self._atlas_lock = threading.Lock()
+        self.use_atlas = True
+
+    def atlas(self):
+        """Атлас текстур (грузится при первом обращении) или None."""
+        with self._atlas_lock:
+            if self._atlas is None and self.use_atlas:
+                from atlas import load_atlas
+
+                self._atlas = load_atlas(bundle) or False
+            return self._atlas or None
+
+    def __contains__(self, path) -> bool:
+        return resolve(path) in self._items
+
+    def get(self, path):
+        """Текстура для файла; при промахе грузится с диска (или дожидается фоновой загрузки)."""
+        key = resolve(path)
+        while True:
+            with self._lock:
+                item = self._items.get(key)
+                if item is not None:
+                    self._items.move_to_end(key)
+                    self.hits += 1
+                    return item[0]
+                pending = self._loading.get(key)
+                if pending is None:
+                    pending = self._loading[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # файл уже грузится в фоне — ждём его, а не читаем второй раз
+            pending.wait()
+        return self._load(key, pending)
+
+    def _load(self, key: Path, done: threading.Event):
+        import arcade
+        from PIL import Image
+
+        try:
+            image = None
+            atlas_key = bundle_key(key, BASE_DIR)
+            # атлас (и его сборку) трогают только картинки, которые могут в нём лежать
+            atlas = self.atlas() if may_contain(atlas_key) else None
+            if atlas is not None and atlas_key in atlas:
+                image = atlas.crop(atlas_key)
+            else:
+                data = read_bundled(key)
+                if data is not None:
+                    image = Image.open(io.BytesIO(data)).convert("RGBA")
+            hit_box = read_hit_box(key)
+            if image is None and hit_box is not None:
+                image = Image.open(key).convert("RGBA")
+            if image is None:
+                texture = arcade.load_texture(key, hash=str(key))
+            else:
+                texture = arcade.Texture(image, hit_box_points=hit_box, hash=str(key))
+                texture.file_path = key
+            self._store(key, texture)
+            return texture
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            done.set()
+
+    def _store(self, key: Path, texture):
+        size = texture.width * texture.height * 4
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = (texture, size)
+            self.used += size
+            # самую свежую текстуру не вытесняем, даже если она одна больше бюджета
+            while self.used > self.budget and len(self._items) > 1:
+                _, (_, old_size) = self._items.popitem(last=False)
+                self.used -= old_size
+
+    def preload(self, paths) -> threading.Thread:
+        """Грузит файлы в фоновом потоке, пропуская уже загруженные."""
+        def worker():
+            for path in paths:
+                key = resolve(path)
+                with self._lock:
+                    if key in self._items or key in self._loading:
+                        continue
+                    done = self._loading[key] = threading.Event()
+                try:
+                    self._load(key, done)
+                except Exception as exc:  # битый файл не должен ронять заставку
+                    print(f"Warning, can't preload {key}: {exc}")
+
+        thread = threading.Thread(target=worker, name="asset-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.used = 0
+
+
+textures = TextureCache()
@@ -0,0 +1,190 @@
+"""Атлас текстур: все картинки тайлов уровней и (уменьшенные) спрайты персонажей в одном PNG плюс индекс областей.
+
+Вместо десятка крошечных PNG (blocs/...) и двух спрайтов игра декодирует один файл
+и вырезает из него области. Атлас собирается командой python atlas.py или сам, при
+первой загрузке картинки, которая может в нём лежать (may_contain), если его нет или
+исходники изменились (как levels/*.json по хешам карт). Картинки меню и заставки
+в атлас не входят и его не ждут.
+
+Индекс (JSON рядом с PNG): версия, mtime исходников и области {ключ: [x, y, w, h]},
+где ключ — путь относительно папки игры через "/", как в архиве ассетов (bundle.py).
+"""
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+from bundle import bundle_key
+from sprites import SPRITE_SCALES, ensure_variant
+
+BASE_DIR = Path(__file__).resolve().parent
+ATLAS_DIR = BASE_DIR / "assets" / "atlas"
+ATLAS_IMAGE = ATLAS_DIR / "atlas.png"
+ATLAS_INDEX = ATLAS_DIR / "atlas.json"
+ATLAS_VERSION = 1
+MAX_SIZE = 4096
+PADDING = 1
+# папки (ключи bundle_key), из которых картинки идут в атлас: тайлы и уменьшенные спрайты
+SOURCE_DIRS = ("blocs/", "assets/sprites/scaled/")
+
+
+def may_contain(key) -> bool:
+    """Может ли картинка с ключом key (bundle_key или None) лежать в атласе — без загрузки атласа."""
+    return key is not None and key.startswith(SOURCE_DIRS)
+
+
+def collect_images(base_dir: Path = BASE_DIR) -> list:
+    """Абсолютные пути всех картинок тайлов уровней и уменьшенных спрайтов персонажей, без повторов."""
+    from levels import level_names, load_level
+
+    images = []
+    for name in level_names():
+        level = load_level(name)
+        images += [str(base_dir / tile.image) for tile in level.tiles.values() if tile.image]
+    images += [str(ensure_variant(base_dir / source, scale)[0]) for source, scale in SPRITE_SCALES.items()]
+    # картинки вне SOURCE_DIRS (и вне папки игры) в атлас не попадут и грузятся по одной
+    paths = dict.fromkeys(str(Path(p).resolve()) for p in images)
+    return [p for p in paths if may_contain(bundle_key(p, base_dir))]
+
+
+def _next_pow2(value: int) -> int:
+    size = 1
+    while size < value:
+        size *= 2
+    return size
+
+
+def _shelves(order, sizes: dict, width: int, padding: int):
+    positions = {}
+    x = y = shelf_h = 0
+    for key in order:
+        w, h = sizes[key]
+        if x and x + w > width:
+            x, y = 0, y + shelf_h + padding
+            shelf_h = 0
+        positions[key] = (x, y)
+        x += w + padding
+        shelf_h = max(shelf_h, h)
+    return y + shelf_h, positions
+
+
+def pack(sizes: dict, padding: int = PADDING, max_size: int = MAX_SIZE):
+    """Раскладка прямоугольников полками: {ключ: (w, h)} -> (ширина, высота, {ключ: (x, y)}).
+
+    Ширина перебирается по степеням двойки, берётся лист наименьшей площади;
+    высота — ровно по содержимому (в видеопамять лист целиком не грузится).
+    """
+    order = sorted(sizes, key=lambda k: (sizes[k][1], sizes[k][0]), reverse=True)
+    best = None
+    width = _next_pow2(max((w for w, _ in sizes.values()), default=1))
+    while width <= max_size:
+        height, positions = _shelves(order, sizes, width, padding)
+        if height <= max_size and (best is None or width * height < best[0] * best[1]):
+            best = (width, height, positions)
+        width *= 2
+    if best is None:
+        raise ValueError(f"атлас не помещается в {max_size}x{max_size}")
+    return best
+
+
+def _sources_key(paths) -> dict:
+    return {bundle_key(p): os.stat(p).st_mtime_ns for p in paths}
+
+
+def build_atlas(images=None, image_path: Path = ATLAS_IMAGE, index_path: Path = ATLAS_INDEX) -> dict:
+    """Собирает атлас из картинок (по умолчанию — collect_images()). Возвращает индекс."""
+    from PIL import Image
+
+    images = collect_images() if images is None else images
+    loaded = {bundle_key(p): Image.open(p).convert("RGBA") for p in images}
+    width, height, positions = pack({key: im.size for key, im in loaded.items()})
+
+    sheet = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    regions = {}
+    for key, im in loaded.items():
+        x, y = positions[key]
+        sheet.paste(im, (x, y))
+        regions[key] = [x, y, im.width, im.height]
+
+    # исходники спрайтов тоже: копию пересоберут, и атлас должен устареть вместе с ней
+    sources = images + [str(BASE_DIR / source) for source in SPRITE_SCALES]
+    index = {"version": ATLAS_VERSION, "sources": _sources_key(sources), "regions": regions}
+    Path(image_path).parent.mkdir(parents=True, exist_ok=True)
+    sheet.save(image_path, optimize=True)
+    Path(index_path).write_text(json.dumps(index, ensure_ascii=False), encoding="utf-8")
+    return index
+
+
+class Atlas:
+    """Атлас в памяти: region(ключ) -> (x, y, w, h) и image() — PIL-картинка всего листа."""
+
+    def __init__(self, regions: dict, load_image):
+        self.regions = regions
+        self._load_image = load_image
+        self._image = None
+        self._lock = threading.Lock()
+
+    def __contains__(self, key) -> bool:
+        return key in self.regions
+
+    def image(self):
+        with self._lock:
+            if self._image is None:
+                self._image = self._load_image().convert("RGBA")
+            return self._image
+
+    def crop(self, key):
+        x, y, w, h = self.regions[key]
+        return self.image().crop((x, y, x + w, y + h))
+
+
+def _read_index(index_path: Path, check_sources: bool):
+    try:
+        index = json.loads(Path(index_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != ATLAS_VERSION:
+        return None
+    if check_sources:
+        try:
+            paths = [BASE_DIR / key for key in index["sources"]]
+            if _sources_key(paths) != index["sources"]:
+                return None
+        except OSError:
+            return None
+    return index
+
+
+def load_atlas(bundle=None):
+    """Атлас из архива ассетов или из assets/atlas/ (пересобирается, если устарел). None — без атласа."""
+    from PIL import Image
+    import io
+
+    if bundle is not None:
+        index_key, image_key = bundle_key(ATLAS_INDEX), bundle_key(ATLAS_IMAGE)
+        data = bundle.get(index_key)
+        if data is None:
+            return None
+        index = json.loads(bytes(data).decode("utf-8"))
+        return Atlas(index["regions"], lambda: Image.open(io.BytesIO(bundle.get(image_key))))
+
+    index = _read_index(ATLAS_INDEX, check_sources=True)
+    if index is None:
+        try:
+            index = build_atlas()
+        except (OSError, ValueError) as exc:
+            # нет исходников или папка только для чтения — грузим картинки по одной
+            print(f"Warning, can't build texture atlas: {exc}")
+            return None
+    return Atlas(index["regions"], lambda: Image.open(ATLAS_IMAGE))
+
+
+def main(argv=None):
+    index = build_atlas()
+    print(f"{ATLAS_IMAGE}: {len(index['regions'])} картинок")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+"""Набор замеров производительности без окна на экране: загрузка уровней, физика, отрисовка, музыка, смена экранов.
+
+Всё идёт через настоящие GameWindow, ViewRouter и экраны игры, как в soak.py; окно
+собирает headless.open_window(): arcade работает в headless-режиме (ARCADE_HEADLESS=1,
+нужны EGL и libX11, X-сервер не нужен; программный GL вроде llvmpipe тоже годится). Замеры:
+
+    setup_level.lvlN        GameView.setup_level() (.first — первая загрузка за запуск)
+    physics.lvlN            тиков/с GameView.on_update на записанном вводе (режим повтора)
+    physics.headless.lvlN   тиков/с той же записи через Simulation без спрайтов (replay.run_headless)
+    draw.lvlN, .p99         медиана и p99 кадра GameView.on_draw вместе с ожиданием GPU (ctx.finish)
+    music.call, music.ready AudioManager.play_music: медиана вызова и времени до старта плеера
+    view.A_to_B             смена экрана вместе с первым кадром нового
+
+Разовые операции (загрузка, прогон физики, переход) и медиана кадра берутся
+лучшими из --repeat повторов, как в timeit: на общей машине помехи только
+замедляют, а не ускоряют. База привязана к машине и GL: сравнивайте с базой,
+снятой там же (--save-baseline).
+
+Если записи нет (--replay), ввод берётся из SCRIPT. Результаты пишутся в JSON
+(--output) и сравниваются с сохранённой базой (--baseline): ухудшение больше
+--tolerance — регрессия, код выхода 1; у замеров по одному значению (.first, .p99)
+допуск шире — NOISY_TOLERANCE. Недоступный замер (например, нет аудио или
+декодера MP3) записывается со значением null и в сравнении пропускается.
+
+    python bench.py [--levels 1 2 3] [--frames 300] [--output bench_results.json]
+    python bench.py --save-baseline      # записать результаты как новую базу
+"""
+import argparse
+import itertools
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+
+import headless
+from profiler import percentile
+
+FRAME = 1 / 60
+BASE_DIR = Path(__file__).resolve().parent
+BASELINE = BASE_DIR / "bench_baseline.json"
+RESULTS = BASE_DIR / "bench_results.json"
+MUSIC_TRACKS = ("menu.mp3", "game.mp3", "pause.mp3", "game.mp3", "lose.mp3")
+MUSIC_TIMEOUT = 5.0   # секунд на загрузку одного трека
+NOISY_TOLERANCE = 0.5
+# ввод по умолчанию: (кадров, маска огня, маска воды) — шаги туда-обратно и прыжки у точки
+# появления; за цикл персонажи возвращаются на место и ни на одном уровне не гибнут
+SCRIPT = ((10, 2, 2), (20, 1, 1), (10, 2, 2), (8, 4, 4), (10, 0, 0))
+
+
+class Results:
+    """Замеры по имени: значение, единица и что лучше — меньше или больше."""
+
+    def __init__(self):
+        self.meta = {}
+        self.metrics = {}
+
+    def add(self, name: str, value, unit: str, better: str = "lower", error: str = None,
+            tolerance: float = None):
+        entry = {"value": None if value is None else round(value, 4), "unit": unit, "better": better}
+        if tolerance is not None:
+            entry["tolerance"] = tolerance
+        if error:
+            entry["error"] = error
+        self.metrics[name] = entry
+        shown = "недоступно: " + error if value is None else f"{value:.3f} {unit}"
+        print(f"  {name:<28}{shown}", flush=True)
+
+    def to_json(self) -> dict:
+        return {"meta": self.meta, "metrics": self.metrics}
+
+
+def median(values) -> float:
+    return percentile(values, 0.5)
+
+
+def scripted_replay(level: int, view, frames: int):
+    """Запись ввода из SCRIPT на frames кадров: стартовые тела — хитбоксы персонажей вида."""
+    from physics import FixedStep
+    from replay import Replay, ReplayHeader
+
+    boxes = [(p.left, p.bottom, p.right - p.left, p.top - p.bottom) for p in view.players]
+    config = view.window.game_config
+    header = ReplayHeader(level, view.physics.tick_rate, len(boxes), config.difficulty, boxes,
+                          view.physics.collision)
+    replay, clock = Replay(header), FixedStep(header.tick_rate)
+    script = itertools.chain.from_iterable([(fire, water)] * count for count, fire, water in SCRIPT)
+    for masks in itertools.islice(itertools.cycle(script), frames):
+        replay.frames.append((FRAME, [masks] * clock.advance(FRAME)))
+    return replay
+
+
+class Bench:
+    def __init__(self, window, fix, results: Results, frames: int, repeat: int):
+        self.window = window
+        self.fix = fix
+        self.results = results
+        self.frames = frames
+        self.repeat = repeat
+
+    def finish(self):
+        # программный GL копит команды; без finish() мерили бы только их постановку в очередь
+        self.window.ctx.finish()
+
+    def draw(self, count: int = 1):
+        for _ in range(count):
+            self.window.dispatch_event("on_update", FRAME)
+            self.window.draw(FRAME)
+
+    def setup_level(self, level: int):
+        views = self.window.views
+        start = time.perf_counter()
+        view = views.get(self.fix.GameView, level=level)
+        first = time.perf_counter() - start
+        times = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            view.setup_level()
+            times.append(time.perf_counter() - start)
+        self.results.add(f"setup_level.lvl{level}", min(times) * 1000, "ms")
+        self.results.add(f"setup_level.lvl{level}.first", first * 1000, "ms", tolerance=NOISY_TOLERANCE)
+        return view
+
+    def physics(self, level: int, replay):
+        from replay import run_headless
+
+        best = best_headless = 0.0
+        for _ in range(self.repeat):
+            view = self.fix.GameView(level=level, replay=replay)
+            self.window.show_view(view)
+            elapsed = 0.0
+            # последний кадр записи не трогаем: на пустой записи вид печатает итог и зовёт arcade.exit()
+            while not view.finished and not view.replay.finished:
+                start = time.perf_counter()
+                view.on_update(FRAME)
+                elapsed += time.perf_counter() - start
+            best = max(best, view.sim.tick / elapsed)
+            sim, elapsed = run_headless(replay, self.fix.LEVEL_SCALING)
+            best_headless = max(best_headless, sim.tick / elapsed)
+        self.results.add(f"physics.lvl{level}", best, "ticks/s", "higher")
+        self.results.add(f"physics.headless.lvl{level}", best_headless, "ticks/s", "higher")
+
+    def draw_level(self, level: int):
+        view = self.window.views.show(self.fix.GameView, level=level)
+        self.draw(5)
+        self.finish()
+        times, medians = [], []
+        batch = max(1, self.frames // self.repeat)
+        for _ in range(self.repeat):
+            batch_times = []
+            for _ in range(batch):
+                view.on_update(FRAME)
+                start = time.perf_counter()
+                view.on_draw()
+                self.finish()
+                batch_times.append(time.perf_counter() - start)
+            medians.append(median(batch_times))
+            times.extend(batch_times)
+        # медиана — лучшая из пачек по frames / repeat кадров, p99 — по всем кадрам
+        self.results.add(f"draw.lvl{level}", min(medians) * 1000, "ms")
+        self.results.add(f"draw.lvl{level}.p99", percentile(times, 0.99) * 1000, "ms",
+                         tolerance=NOISY_TOLERANCE)
+
+    def music(self):
+        import pyglet
+
+        audio = self.window.audio
+        audio.set_sound(True)
+        calls, ready, error = [], [], None
+        try:
+            for _ in range(self.repeat):
+                for track in MUSIC_TRACKS:
+                    path = self.fix.resolve_asset(f"assets/music/{track}")
+                    start = time.perf_counter()
+                    audio.play_music(path)
+                    calls.append(time.perf_counter() - start)
+                    while audio.current_player is None:
+                        if audio.current_path is None:
+                            raise RuntimeError(f"не загрузился {track}")
+                        if time.perf_counter() - start > MUSIC_TIMEOUT:
+                            raise RuntimeError(f"{track} не загрузился за {MUSIC_TIMEOUT:.0f} с")
+                        pyglet.clock.tick()
+                        time.sleep(0.001)
+                    ready.append(time.perf_counter() - start)
+        except Exception as exc:   # нет аудиоустройства или декодера — замер недоступен
+            error = str(exc) or type(exc).__name__
+        finally:
+            audio.set_sound(False)
+        for name, times in (("music.call", calls), ("music.ready", ready)):
+            value = None if error else median(times) * 1000
+            self.results.add(name, value, "ms", error=error)
+
+    def transitions(self, level: int):
+        import arcade
+
+        fix, views, window = self.fix, self.window.views, self.window
+        steps = (
+            ("menu_to_levels", lambda: views.show(fix.LevelSelectView)),
+            ("levels_to_game", lambda: fix.start_level(window, level)),
+            ("game_to_pause", lambda: window.dispatch_event("on_key_press", arcade.key.ESCAPE, 0)),
+            ("pause_to_game", lambda: window.show_view(window.current_view.game_view)),
+            ("game_to_lose", lambda: views.show(fix.LoseView, level_num=level, game_view=window.current_view)),
+            ("lose_to_game", lambda: views.show(fix.GameView, level=level)),
+            ("game_to_menu", lambda: views.show(fix.MainMenuView)),
+        )
+        times = {name: [] for name, _ in steps}
+        views.show(fix.MainMenuView)
+        self.draw(2)
+        # первый проход — прогрев: виды создаются и строят UI один раз за запуск
+        for lap in range(self.repeat + 1):
+            for name, step in steps:
+                self.finish()
+                start = time.perf_counter()
+                step()
+                window.draw(FRAME)
+                self.finish()
+                if lap:
+                    times[name].append(time.perf_counter() - start)
+                self.draw(2)
+        for name, values in times.items():
+            self.results.add(f"view.{name}", min(values) * 1000, "ms")
+
+
+def run(levels, frames: int, repeat: int, physics_frames: int, replays=()) -> Results:
+    window = headless.open_window("bench")
+    import arcade
+    import fix
+    from replay import load_replay
+
+    results = Results()
+    results.meta = {
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "arcade": arcade.version.VERSION,
+        "renderer": window.ctx.info.RENDERER,
+        "frames": frames,
+        "physics_frames": physics_frames,
+        "repeat": repeat,
+    }
+    print(f"{results.meta['renderer']}, Python {results.meta['python']}, arcade {results.meta['arcade']}")
+    bench = Bench(window, fix, results, frames, repeat)
+    recorded = {}
+    for path in replays:
+        replay = load_replay(path)
+        recorded[replay.header.level] = replay
+    for level in levels:
+        view = bench.setup_level(level)
+        replay = recorded.get(level) or scripted_replay(level, view, physics_frames)
+        bench.physics(level, replay)
+        bench.draw_level(level)
+    bench.music()
+    bench.transitions(levels[0])
+    window.close()
+    return results
+
+
+def compare(metrics: dict, baseline: dict, tolerance: float):
+    """Строки отчёта [(имя, база, сейчас, изменение, статус)] и список регрессий."""
+    rows, regressions = [], []
+    for name, entry in metrics.items():
+        old = baseline.get(name, {}).get("value")
+        new = entry["value"]
+        if old is None or new is None:
+            status = "нет базы" if new is not None else "недоступно"
+            rows.append((name, old, new, None, status))
+            continue
+        change = (new - old) / old if old else 0.0
+        worse = change if entry["better"] == "lower" else -change
+        allowed = max(tolerance, entry.get("tolerance", 0.0))
+        status = "РЕГРЕССИЯ" if worse > allowed else "лучше" if worse < -allowed else "ок"
+        if worse > allowed:
+            regressions.append(name)
+        rows.append((name, old, new, change, status))
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замеры производительности без окна и сравнение с базой")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--frames", type=int, default=300, help="кадров на замер отрисовки")
+    parser.add_argument("--physics-frames", type=int, default=1800, help="кадров записи на прогон физики")
+    parser.add_argument("--repeat", type=int, default=5, help="повторов загрузки, физики, музыки и переходов")
+    parser.add_argument("--replay", nargs="*", default=[], metavar="FILE",
+                        help="записи ввода (python fix.py --record) вместо SCRIPT для их уровней")
+    parser.add_argument("--output", default=str(RESULTS), help="куда записать результаты в JSON")
+    parser.add_argument("--baseline", default=str(BASELINE), help="база для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="допустимое ухудшение, доля от базы")
+    parser.add_argument("--save-baseline", action="store_true", help="записать результаты как новую базу")
+    args = parser.parse_args(argv)
+
+    results = run(args.levels, args.frames, args.repeat, args.physics_frames, args.replay)
+    data = results.to_json()
+    Path(args.output).write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    print(f"результаты -> {args.output}")
+    if args.save_baseline:
+        Path(args.baseline).write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"база -> {args.baseline}")
+        return 0
+
+    baseline_path = Path(args.baseline)
+    if not baseline_path.exists():
+        print(f"нет базы {baseline_path}, сравнивать не с чем (--save-baseline)")
+        return 0
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    if baseline["meta"].get("renderer") != results.meta["renderer"]:
+        print(f"внимание: база снята на {baseline['meta'].get('renderer')}, сравнение приблизительное")
+    rows, regressions = compare(results.metrics, baseline["metrics"], args.tolerance)
+    print(f"{'замер':<28}{'база':>12}{'сейчас':>12}{'изм.':>9}")
+    for name, old, new, change, status in rows:
+        old_text = "-" if old is None else f"{old:.3f}"
+        new_text = "-" if new is None else f"{new:.3f}"
+        change_text = "" if change is None else f"{change:+.1%}"
+        print(f"{name:<28}{old_text:>12}{new_text:>12}{change_text:>9}  {status}")
+    if regressions:
+        print(f"регрессий: {len(regressions)} (допуск {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Один файл со всеми ассетами игры (картинки, музыка, карты) для собранного exe.
+
+Формат (little-endian):
+    заголовок: b"GPAK", версия u16, смещение индекса u64;
+    дальше содержимое файлов подряд;
+    в конце индекс — JSON, сжатый zlib: {ключ: [смещение, размер]}.
+
+Ключ — путь относительно папки игры через "/", например "assets/music/menu.mp3".
+Уровни кладутся скомпилированными (levels/, см. levels.py), с путями к тайлам
+в виде таких же ключей; сами .tmx/.tsx собранной игре не нужны.
+
+Файл открывается через mmap: чтение ассета — срез памяти, без открытия файлов
+и без распаковки во временную папку.
+Сборка: python bundle.py [dist/assets.pak]
+"""
+import json
+import mmap
+import struct
+import sys
+import zlib
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+BUNDLE_NAME = "assets.pak"
+MAGIC = b"GPAK"
+VERSION = 1
+_HEADER = struct.Struct("<4sHQ")
+
+# что кладём в архив: папки целиком
+ASSET_DIRS = ("assets", "blocs", "levels")
+
+
+class AssetBundle:
+    """Архив ассетов, отображённый в память. get(ключ) -> memoryview или None."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        magic, version, index_offset = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path}: не архив ассетов или неподдерживаемая версия")
+        self.index = json.loads(zlib.decompress(self._mmap[index_offset:]))
+
+    def __contains__(self, key) -> bool:
+        return key in self.index
+
+    def get(self, key):
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        offset, size = entry
+        return self._view[offset:offset + size]
+
+    def close(self):
+        if getattr(self, "_view", None) is not None:
+            self._view.release()
+            self._view = None
+        if not self._mmap.closed:
+            self._mmap.close()
+        self._file.close()
+
+
+def bundle_key(path, base_dir: Path = BASE_DIR):
+    """Абсолютный путь -> ключ архива или None, если файл вне папки игры."""
+    try:
+        return Path(path).resolve().relative_to(base_dir).as_posix()
+    except ValueError:
+        return None
+
+
+def find_bundle():
+    """Архив рядом с exe (собранная игра) или из переменной GAME_BUNDLE; иначе None — играем с папок."""
+    import os
+
+    path = os.environ.get("GAME_BUNDLE")
+    if path is None and getattr(sys, "frozen", False):
+        path = Path(sys.executable).resolve().parent / BUNDLE_NAME
+    if path is None or not Path(path).is_file():
+        return None
+    return AssetBundle(path)
+
+
+def collect_files(base_dir: Path = BASE_DIR) -> list:
+    files = []
+    for folder in ASSET_DIRS:
+        files += [p for p in sorted((base_dir / folder).rglob("*")) if p.is_file()]
+    return files
+
+
+def build_bundle(out_path, base_dir: Path = BASE_DIR) -> dict:
+    """Собирает архив. Возвращает индекс {ключ: [смещение, размер]}."""
+    from atlas import build_atlas
+    from levels import compile_levels
+
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    # свежие уровни и атлас текстур попадут в архив вместе с levels/ и assets/
+    compile_levels()
+    build_atlas()
+    entries = [(bundle_key(p, base_dir), p.read_bytes()) for p in collect_files(base_dir)]
+
+    index = {}
+    with open(out_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0))
+        for key, data in entries:
+            index[key] = [f.tell(), len(data)]
+            f.write(data)
+        index_offset = f.tell()
+        f.write(zlib.compress(json.dumps(index, ensure_ascii=False).encode("utf-8")))
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, index_offset))
+    return index
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    out = Path(argv[0]) if argv else BASE_DIR / "dist" / BUNDLE_NAME
+    index = build_bundle(out)
+    size = sum(size for _, size in index.values())
+    print(f"{out}: {len(index)} файлов, {size / 1024 / 1024:.1f} МБ")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
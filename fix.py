@@ -1,12 +1,29 @@
+import time
+STARTUP_T0 = time.perf_counter()   # до тяжёлых импортов — для --startup-time
+
 import arcade
-import os
-import arcade.gui
 from dataclasses import dataclass
 from pathlib import Path
-from pyglet.window import key
-from PIL import Image
 import pyglet
-import math
+import argparse
+import importlib
+import queue
+import threading
+import weakref
+from assets import load_sound, resolve as resolve_asset, textures
+from levels import level_count, load_level
+from replay import InputRecorder, ReplayHeader, ReplayPlayer, load_replay
+from profiler import frame_profiler
+from sprites import PLAYER_SCALE, ensure_variant, scaled_texture
+
+# Модули, которые заставке не нужны (arcade.gui, NumPy через physics): импортируются
+# в фоне, пока заставка на экране, а код ниже берёт их локальным import'ом.
+DEFERRED_MODULES = ("arcade.gui", "physics")
+
+
+def load_deferred_modules():
+    for name in DEFERRED_MODULES:
+        importlib.import_module(name)
 
 def draw_fullscreen_texture(window: arcade.Window, texture: arcade.Texture):
     w, h = window.width, window.height
@@ -45,22 +62,31 @@ def draw_fullscreen_texture(window: arcade.Window, texture: arcade.Texture):
 BASE_DIR = Path(__file__).resolve().parent
 ASSETS_DIR = BASE_DIR / "assets"
 SPRITES_DIR = ASSETS_DIR / "sprites"
-LEVELS = [
-    "assets/maps/lvl1.json",
-    "assets/maps/lvl2.json",
-    "assets/maps/lvl3.json"
+# Текстуры, которые SplashView подгружает в фоне, пока показывает заставку
+PRELOAD_TEXTURES = [
+    ASSETS_DIR / "background.png",
+    ASSETS_DIR / "bg.png",
+    ASSETS_DIR / "st.png",
+    ASSETS_DIR / "ex.png",
+    ASSETS_DIR / "Levels_bg.png",
+    ASSETS_DIR / "settings_bg.png",
 ]
 
 # === Константы окна ===
 SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 900
 TILE_SCALING = 1
-# === Базовые значения геймплея (могут меняться настройками) ===
-PLAYER_MOVE_SPEED = 3
-PLAYER_JUMP_SPEED = 2
-GRAVITY = 1.35
-PLAYER_ACCELERATION = 0.5   # как быстро разгоняется
-PLAYER_FRICTION = 0.1       # как быстро тормозит (0 = резкая остановка)
+LEVEL_SCALING = 1.5   # тайлы 20px -> 30px, карта 40x30 занимает весь экран
+# слои, которые меняются по ходу уровня; все остальные запекаются в StaticLayers
+DYNAMIC_LAYERS = ("fire_gems", "water_gems")
+# карты больше окна рисуются чанками и с камерой, следящей за игроками
+CHUNK_TILES = 16      # сторона чанка в клетках карты
+CHUNK_MARGIN = 1      # сколько чанков вокруг кадра держать собранными
+# меню рисуются по требованию: после событий — как обычно, в простое — редко и без перерисовки
+FRAME_RATE = 1 / 60
+IDLE_FRAME_RATE = 1 / 10
+IDLE_AFTER = 0.5      # секунд без событий, после которых меню засыпает
+# Значения геймплея (скорость, прыжок, гравитация) живут в physics.PhysicsConfig
 # --- Константы управления ---
 PLAYER_SPEED = 3      # скорость движения влево/вправо
 JUMP_SPEED = 0.5     # сила прыжка
@@ -77,31 +103,130 @@ class GameConfig:
     difficulty: str = "Нормальная"
     sound_on: bool = True
     show_hints: bool = True
+    tick_rate: int = None   # None — physics.PHYSICS_TICK_RATE
+    collision: str = "discrete"   # "swept" — без проскоков сквозь платформы при редких тиках
 
 class AudioManager:
+    """Музыка игры: один трек за раз, с кроссфейдом и без перезапуска уже играющего трека.
+
+    Файлы открываются и декодируются в фоновом потоке, чтобы смена музыки не давала
+    рывка кадра; короткие джинглы (CACHED_TRACKS) декодируются целиком один раз и
+    дальше берутся из кэша. Воспроизведение и громкость трогаются только в главном потоке.
+    """
+    CACHED_TRACKS = ("win.mp3", "lose.mp3")
+    FADE_TIME = 0.4
+
     def __init__(self):
         self.menu_music = None
         self.game_music = None
         self.current_player = None
+        self.current_path = None
         self.sound_on = True
-
-    def play_music(self, path, loop=True):
+        self.volume = 1.0
+        self._cache = {}            # путь -> arcade.Sound (только джинглы)
+        self._loaded = queue.Queue()  # (поколение, путь, Sound | None, loop, fade) из фонового потока
+        self._generation = 0        # растёт при каждой смене трека; старые загрузки отбрасываются
+        self._fade_in = None        # (player, секунды)
+        self._fade_out = []         # [(player, начальная громкость, секунды)]
+        self._ticking = False
+
+    def play_music(self, path, loop=True, fade=FADE_TIME):
+        """Ставит трек; ничего не возвращает — файл может ещё грузиться в фоне."""
         if not self.sound_on:
             return
-        if self.current_player:
-            self.current_player.pause()
-            self.current_player.delete()
-            self.current_player = None
+        key = str(resolve_asset(path))
+        if key == self.current_path:
+            # тот же трек уже играет (или грузится) — не перезапускаем
+            return
+        self.current_path = key
+        self._generation += 1
+        self._fade_out_current(fade)
 
-        sound = arcade.Sound(path, streaming=True)
-        self.current_player = sound.play(loop=loop)
-        return sound
+        sound = self._cache.get(key)
+        if sound is not None:
+            self._start(sound, loop, fade)
+            return
+        threading.Thread(target=self._load, args=(self._generation, key, loop, fade),
+                         name="audio-load", daemon=True).start()
+        self._schedule()
+
+    def _load(self, generation, key, loop, fade):
+        # фоновый поток: только открываем/декодируем файл
+        streaming = Path(key).name not in self.CACHED_TRACKS
+        try:
+            sound = load_sound(key, streaming=streaming)
+        except Exception as exc:
+            print(f"Warning, can't load music {key}: {exc}")
+            sound = None
+        self._loaded.put((generation, key, sound, loop, fade))
+
+    def _start(self, sound, loop, fade):
+        self.current_player = sound.play(volume=0.0 if fade else self.volume, loop=loop)
+        self._fade_in = (self.current_player, fade) if fade else None
+        self._schedule()
+
+    def _fade_out_current(self, fade):
+        player = self.current_player
+        self.current_player = None
+        self._fade_in = None
+        if player is None:
+            return
+        if fade:
+            self._fade_out.append((player, player.volume, fade))
+            self._schedule()
+        else:
+            player.pause()
+            player.delete()
+
+    def _schedule(self):
+        if not self._ticking:
+            self._ticking = True
+            pyglet.clock.schedule_interval(self._tick, 1 / 60)
+
+    def _tick(self, delta_time):
+        # готовые треки из фонового потока
+        while not self._loaded.empty():
+            generation, key, sound, loop, fade = self._loaded.get_nowait()
+            if generation != self._generation or not self.sound_on:
+                # пока грузили, уже попросили другой трек (даже если потом вернулись к этому —
+                # у того запроса своя загрузка, иначе трек запустился бы дважды)
+                continue
+            if sound is None:
+                self.current_path = None
+                continue
+            if Path(key).name in self.CACHED_TRACKS:
+                self._cache[key] = sound
+            self._start(sound, loop, fade)
+
+        if self._fade_in is not None:
+            player, fade = self._fade_in
+            player.volume = min(self.volume, player.volume + self.volume * delta_time / fade)
+            if player.volume >= self.volume:
+                self._fade_in = None
+
+        still_fading = []
+        for player, start_volume, fade in self._fade_out:
+            player.volume = max(0.0, player.volume - start_volume * delta_time / fade)
+            if player.volume <= 0.0:
+                player.pause()
+                player.delete()
+            else:
+                still_fading.append((player, start_volume, fade))
+        self._fade_out = still_fading
+
+        loading = self.current_path is not None and self.current_player is None
+        if not (loading or self._fade_in or self._fade_out):
+            pyglet.clock.unschedule(self._tick)
+            self._ticking = False
 
     def stop(self):
-        if self.current_player:
-            self.current_player.pause()
-            self.current_player.delete()
-            self.current_player = None
+        self.current_path = None
+        self._generation += 1
+        self._fade_out_current(0)
+        for player, _, _ in self._fade_out:
+            player.pause()
+            player.delete()
+        self._fade_out = []
 
     def set_sound(self, enabled: bool):
         self.sound_on = enabled
@@ -109,83 +234,558 @@ class AudioManager:
             self.stop()
 
 def apply_config(cfg: GameConfig):
-    global PLAYER_MOVE_SPEED, PLAYER_JUMP_SPEED, GRAVITY
-    if cfg.difficulty == "Лёгкая":
-        PLAYER_MOVE_SPEED = 4
-        PLAYER_JUMP_SPEED = 10
-        GRAVITY = 0.5
-    elif cfg.difficulty == "Сложная":
-        PLAYER_MOVE_SPEED = 6
-        PLAYER_JUMP_SPEED = 12
-        GRAVITY = 0.5
+    """Настройки игры -> параметры физики для Simulation (глобальные переменные больше не трогаем)."""
+    from physics import PHYSICS_TICK_RATE, PhysicsConfig
+
+    return PhysicsConfig.for_difficulty(
+        cfg.difficulty,
+        tick_rate=getattr(cfg, "tick_rate", None) or PHYSICS_TICK_RATE,
+        require_gems=REQUIRE_GEMS,
+        collision=getattr(cfg, "collision", "discrete"),
+    )
+
+# === Спрайты уровня ===
+@dataclass
+class SpriteSpec:
+    """Где и каким стоит тайл уровня; из этого строится arcade.Sprite."""
+    image: str
+    center_x: float
+    center_y: float
+    width: float
+    height: float
+    cell: int
+    properties: dict
+
+
+def layout_level_sprites(level, scaling: float) -> dict:
+    """Раскладка тайлов по слоям без arcade: {слой: [SpriteSpec]}. Можно считать в фоновом потоке."""
+    tile_w = level.tile_width * scaling
+    tile_h = level.tile_height * scaling
+    result = {}
+    for name, gids in level.layers.items():
+        specs = []
+        for index, gid in enumerate(gids):
+            if gid == 0:
+                continue
+            tile = level.tiles.get(gid)
+            if tile is None or not tile.image:
+                continue
+            # размер берём из тайлсета: картинка-заглушка может быть меньше тайла
+            width = tile.width * scaling
+            height = tile.height * scaling
+            row, col = divmod(index, level.width)
+            specs.append(SpriteSpec(
+                tile.image,
+                col * tile_w + width / 2,
+                (level.height - row - 1) * tile_h + height / 2,
+                width, height, index, tile.properties,
+            ))
+        result[name] = specs
+    return result
+
+
+def build_level_sprites(level, scaling: float, layer_options=None, layout=None) -> dict:
+    """Строит SpriteList'ы всех тайловых слоёв из уже разобранного уровня (без повторного чтения .tmx)."""
+    layer_options = layer_options or {}
+    if layout is None:
+        layout = layout_level_sprites(level, scaling)
+    result = {}
+    for name, specs in layout.items():
+        options = layer_options.get(name, {})
+        sprite_list = arcade.SpriteList(use_spatial_hash=options.get("use_spatial_hash", False))
+        sprite_list.extend(tile_sprite(spec) for spec in specs)
+        result[name] = sprite_list
+    return result
+
+
+def tile_sprite(spec: SpriteSpec) -> arcade.Sprite:
+    sprite = arcade.Sprite(textures.get(spec.image))
+    sprite.width = spec.width
+    sprite.height = spec.height
+    sprite.center_x = spec.center_x
+    sprite.center_y = spec.center_y
+    if spec.properties:
+        sprite.properties.update(spec.properties)
+    sprite.properties["cell"] = spec.cell
+    return sprite
+
+
+# === Подготовка уровней в фоне ===
+PLAYER_TEXTURES = (SPRITES_DIR / "fire.png", SPRITES_DIR / "water.png")
+
+
+@dataclass
+class PreparedLevel:
+    """Всё, что для уровня можно сделать без GL: разобранная карта, раскладка тайлов, прогретые текстуры."""
+    level_num: int
+    level: object
+    layout: dict
+
+
+def prepare_level(level_num: int, progress=None) -> PreparedLevel:
+    """Загружает уровень и декодирует его текстуры. progress(доля 0..1) — для экрана загрузки."""
+    level = load_level(level_num)
+    layout = layout_level_sprites(level, LEVEL_SCALING)
+    images = list(dict.fromkeys(spec.image for specs in layout.values() for spec in specs))
+    images += [ensure_variant(path, PLAYER_SCALE)[0] for path in PLAYER_TEXTURES]
+    for done, image in enumerate(images, 1):
+        textures.get(image)
+        if progress is not None:
+            progress(done / len(images))
+    return PreparedLevel(level_num, level, layout)
+
+
+class LevelPreloader:
+    """Готовит уровни в фоновом потоке, пока игрок сидит в меню.
+
+    preload(n) запускает подготовку, take(n) отдаёт готовый уровень (дожидаясь,
+    если он ещё в работе). Если подготовка упала, take() вернёт None и уровень
+    соберётся как раньше, в главном потоке.
+    """
+
+    def __init__(self):
+        self._jobs = {}   # номер уровня -> _PreloadJob
+        self._lock = threading.Lock()
+
+    def preload(self, level_num: int):
+        if not 1 <= level_num <= level_count():
+            return
+        with self._lock:
+            if level_num in self._jobs:
+                return
+            job = self._jobs[level_num] = _PreloadJob()
+        threading.Thread(target=job.run, args=(level_num,), name=f"level-preload-{level_num}",
+                         daemon=True).start()
+
+    def status(self, level_num: int):
+        """None — не готовился, "loading" — в работе, "ready" — можно забирать."""
+        job = self._jobs.get(level_num)
+        if job is None:
+            return None
+        return "ready" if job.done.is_set() else "loading"
+
+    def progress(self, level_num: int) -> float:
+        job = self._jobs.get(level_num)
+        return job.progress if job is not None else 0.0
+
+    def take(self, level_num: int):
+        with self._lock:
+            job = self._jobs.pop(level_num, None)
+        if job is None:
+            return None
+        job.done.wait()
+        return job.result
+
+
+class _PreloadJob:
+    def __init__(self):
+        self.done = threading.Event()
+        self.progress = 0.0
+        self.result = None
+
+    def _set_progress(self, value: float):
+        self.progress = value
+
+    def run(self, level_num: int):
+        try:
+            self.result = prepare_level(level_num, self._set_progress)
+        except Exception as exc:  # соберём в главном потоке и покажем ошибку там
+            print(f"Warning, can't preload level {level_num}: {exc}")
+        finally:
+            self.done.set()
+
+
+def start_level(window, level_num: int):
+    """Переход в игру: если уровень ещё готовится в фоне — через экран загрузки."""
+    preloader = getattr(window, "preloader", None)
+    if preloader is not None and preloader.status(level_num) == "loading":
+        window.views.show(LoadingView, level_num=level_num)
     else:
-        PLAYER_MOVE_SPEED = 5
-        PLAYER_JUMP_SPEED = 11
-        GRAVITY = 0.5
+        window.views.show(GameView, level=level_num)
+
+
+class RenderTarget:
+    """Текстура экранного размера, в которую рисуют редко, а выводят каждый кадр одним квадом.
+
+    downscale > 1 уменьшает текстуру; при выводе она растягивается с линейной
+    фильтрацией, что даёт лёгкое размытие почти бесплатно.
+    """
+
+    def __init__(self, ctx, size, downscale: int = 1):
+        self.ctx = ctx
+        self.size = size
+        width, height = size
+        tex_size = (max(1, width // downscale), max(1, height // downscale))
+        self.texture = ctx.texture(tex_size, components=4, filter=(ctx.LINEAR, ctx.LINEAR))
+        self.fbo = ctx.framebuffer(color_attachments=[self.texture])
+        # мировые координаты 0..size ложатся на всю текстуру, каким бы ни был её размер
+        self.camera = arcade.camera.Camera2D(
+            viewport=arcade.LBWH(0, 0, *tex_size),
+            projection=arcade.LRBT(-width / 2, width / 2, -height / 2, height / 2),
+            position=(width / 2, height / 2),
+            render_target=self.fbo,
+        )
+        self._quad = arcade.gl.geometry.quad_2d_fs()
+
+    def render(self, draw, clear_color=None, center=None):
+        """Перерисовывает содержимое текстуры: draw() вызывается с активной камерой цели.
+
+        center — мировая точка в центре текстуры (для прокручиваемых уровней), по умолчанию size / 2.
+        """
+        width, height = self.size
+        self.camera.position = center if center is not None else (width / 2, height / 2)
+        with self.camera.activate():
+            self.fbo.clear(color=clear_color)
+            draw()
+
+    def draw(self):
+        self.texture.use(0)
+        with self.ctx.enabled(self.ctx.BLEND):
+            self._quad.render(self.ctx.utility_textured_quad_program)
+
+
+WORLD_QUAD_VS = """#version 330
+
+uniform WindowBlock {
+    mat4 projection;
+    mat4 view;
+} window;
+
+in vec2 in_vert;
+in vec2 in_uv;
+out vec2 out_uv;
+
+void main() {
+    out_uv = in_uv;
+    gl_Position = window.projection * window.view * vec4(in_vert, 0.0, 1.0);
+}
+"""
+WORLD_QUAD_FS = """#version 330
+
+uniform sampler2D texture0;
+in vec2 out_uv;
+out vec4 out_colour;
+
+void main() {
+    out_colour = texture(texture0, out_uv);
+}
+"""
+
+
+# контекст -> программа; слабые ключи, чтобы закрытое окно не держало свой GL-контекст
+_world_quad_programs = weakref.WeakKeyDictionary()
+
+
+def world_quad_program(ctx):
+    """Программа текстурного квада в мировых координатах (проекция активной камеры); одна на контекст."""
+    program = _world_quad_programs.get(ctx)
+    if program is None:
+        program = _world_quad_programs[ctx] = ctx.program(
+            vertex_shader=WORLD_QUAD_VS,
+            fragment_shader=WORLD_QUAD_FS,
+        )
+    return program
+
+
+class StaticLayers(RenderTarget):
+    """Неизменные слои уровня, один раз отрисованные в текстуру; за кадр — один квад размером с карту.
+
+    Квад лежит в мировых координатах LBWH(0, 0, size) под активной камерой, поэтому
+    карта любого размера не растягивается на окно и совпадает с кристаллами и игроками.
+    """
+
+    def __init__(self, ctx, size, downscale: int = 1):
+        super().__init__(ctx, size, downscale)
+        self._quad = arcade.gl.geometry.screen_rectangle(0, 0, *size)
+
+    def draw(self):
+        self.texture.use(0)
+        with self.ctx.enabled(self.ctx.BLEND):
+            self._quad.render(world_quad_program(self.ctx))
+
+    def bake(self, sprite_lists):
+        """Перерисовывает слои в текстуру (при загрузке уровня)."""
+        def draw():
+            for sprite_list in sprite_lists:
+                sprite_list.draw()
+        self.render(draw)
+
+
+class FrameSnapshot(RenderTarget):
+    """Снимок игрового кадра под паузой/победой/поражением: снимается один раз при показе экрана."""
+    DIM = (0, 0, 0, 150)
+
+    def __init__(self, ctx, size, downscale: int = 2):
+        super().__init__(ctx, size, downscale)
+
+    def capture(self, game_view, tint=DIM):
+        width, height = self.size
+        center = game_view.camera_center()
+        left, bottom = (0, 0) if center is None else (center[0] - width / 2, center[1] - height / 2)
+
+        def draw():
+            game_view.draw_scene()
+            arcade.draw_lrbt_rectangle_filled(left, left + width, bottom, bottom + height, tint)
+        self.render(draw, clear_color=game_view.window.background_color, center=center)
+
+
+def capture_backdrop(view, game_view, tint=FrameSnapshot.DIM):
+    """Снимает кадр game_view для экрана-оверлея view; текстура создаётся при первом показе."""
+    if game_view is None:
+        view.backdrop = None
+        return
+    if getattr(view, "_snapshot", None) is None:
+        view._snapshot = FrameSnapshot(view.window.ctx, view.window.get_size())
+    view._snapshot.capture(game_view, tint)
+    view.backdrop = view._snapshot
+
+
+class LevelChunks:
+    """Тайлы карты больше экрана, разбитые на чанки CHUNK_TILES x CHUNK_TILES клеток.
+
+    SpriteList'ы есть только у чанков в кадре камеры и CHUNK_MARGIN вокруг него;
+    остальные хранятся раскладкой SpriteSpec и собираются, когда камера подходит.
+    Собранные кристаллы запоминаются и при повторной сборке чанка не появляются.
+    """
+
+    def __init__(self, level, layout: dict, scaling: float, chunk_tiles: int = CHUNK_TILES,
+                 margin: int = CHUNK_MARGIN):
+        self.chunk_width = level.tile_width * scaling * chunk_tiles
+        self.chunk_height = level.tile_height * scaling * chunk_tiles
+        self.chunk_tiles = chunk_tiles
+        self.margin = margin
+        self.level_width = level.width
+        self.level_height = level.height
+        self.static_names = [name for name in layout if name not in DYNAMIC_LAYERS]
+        self._specs = {}      # (столбец, строка чанка; строка снизу) -> {слой: [SpriteSpec]}
+        for name, specs in layout.items():
+            for spec in specs:
+                self._specs.setdefault(self.chunk_of(spec.cell), {}).setdefault(name, []).append(spec)
+        self.loaded = {}      # чанк -> {"static": SpriteList, слой кристаллов: SpriteList}
+        self.removed = set()  # (слой, клетка) собранных кристаллов
+        self._gems = {}       # (слой, клетка) -> спрайт в собранных чанках
+        self.loads = 0
+        self.evictions = 0
+
+    def chunk_of(self, cell: int) -> tuple:
+        row, col = divmod(cell, self.level_width)
+        return col // self.chunk_tiles, (self.level_height - 1 - row) // self.chunk_tiles
+
+    def stream(self, left: float, bottom: float, right: float, top: float):
+        """Собирает чанки у прямоугольника кадра и выгружает остальные.
+
+        Выгружаются только чанки дальше margin + 1: камера, дрожащая у границы чанка,
+        не заставляет собирать и выбрасывать один и тот же чанк каждый кадр.
+        """
+        c0, c1 = int(left // self.chunk_width), int(right // self.chunk_width)
+        r0, r1 = int(bottom // self.chunk_height), int(top // self.chunk_height)
+        keep = self.margin + 1
+        for key in list(self.loaded):
+            if not (c0 - keep <= key[0] <= c1 + keep and r0 - keep <= key[1] <= r1 + keep):
+                self._evict(key)
+        m = self.margin
+        for col in range(c0 - m, c1 + m + 1):
+            for row in range(r0 - m, r1 + m + 1):
+                key = (col, row)
+                if key not in self.loaded and key in self._specs:
+                    self._load(key)
+
+    def _load(self, key):
+        lists = {"static": arcade.SpriteList()}
+        layers = self._specs[key]
+        for name in self.static_names:
+            lists["static"].extend(tile_sprite(spec) for spec in layers.get(name, ()))
+        for name in DYNAMIC_LAYERS:
+            sprite_list = lists[name] = arcade.SpriteList()
+            for spec in layers.get(name, ()):
+                if (name, spec.cell) in self.removed:
+                    continue
+                sprite = tile_sprite(spec)
+                sprite_list.append(sprite)
+                self._gems[(name, spec.cell)] = sprite
+        self.loaded[key] = lists
+        self.loads += 1
+
+    def _evict(self, key):
+        for name in DYNAMIC_LAYERS:
+            for sprite in self.loaded[key][name]:
+                self._gems.pop((name, sprite.properties["cell"]), None)
+        del self.loaded[key]
+        self.evictions += 1
+
+    def remove_gem(self, layer: str, cell: int):
+        self.removed.add((layer, cell))
+        sprite = self._gems.pop((layer, cell), None)
+        if sprite is not None:
+            sprite.remove_from_sprite_lists()
+
+    def draw_static(self):
+        for lists in self.loaded.values():
+            lists["static"].draw()
+
+    def draw_gems(self):
+        # как и без чанков: сначала все fire_gems, потом все water_gems
+        for name in DYNAMIC_LAYERS:
+            for lists in self.loaded.values():
+                lists[name].draw()
+
 
 # === Игровые классы ===
 class Player(arcade.Sprite):
     def __init__(self, image, scale, controls):
-        super().__init__(image, scale)
+        # вместо 1024px исходника — уменьшенная копия с тем же размером на экране
+        texture, scale = scaled_texture(image, scale)
+        super().__init__(texture, scale)
         self.controls = controls
+        # скорости и флаг прыжка — копия тела симуляции (см. sync), сам спрайт не движется
         self.change_x = 0
         self.change_y = 0
-        self.max_speed = 3  # максимальная скорость по X
-        self.acceleration = 0.4  # ускорение
-        self.friction = 3  # замедление
-        self.jump_strength = 13  # сила прыжка
         self.can_jump = False
 
-    def update_movement(self, keys: pyglet.window.key.KeyStateHandler):
-        # --- Горизонтальное движение ---
+    def input_mask(self, keys: pyglet.window.key.KeyStateHandler) -> int:
+        """Состояние клавиш игрока -> битовая маска ввода для Simulation."""
+        from physics import INPUT_JUMP, INPUT_LEFT, INPUT_RIGHT
+
+        mask = 0
         if keys[self.controls["left"]]:
-            self.change_x -= PLAYER_ACCELERATION
-        elif keys[self.controls["right"]]:
-            self.change_x += PLAYER_ACCELERATION
-        else:
-            # трение — плавное замедление
-            if abs(self.change_x) > PLAYER_FRICTION:
-                self.change_x -= PLAYER_FRICTION * (1 if self.change_x > 0 else -1)
-            else:
-                self.change_x = 0
-
-        # Ограничиваем максимальную скорость
-        if self.change_x > PLAYER_MOVE_SPEED:
-            self.change_x = PLAYER_MOVE_SPEED
-        elif self.change_x < -PLAYER_MOVE_SPEED:
-            self.change_x = -PLAYER_MOVE_SPEED
-
-        # --- Прыжок ---
-        if keys[self.controls["jump"]] and self.can_jump:
-            self.change_y = PLAYER_JUMP_SPEED
-            self.can_jump = False
-
-    def update(self, platforms: arcade.SpriteList, delta_time: float = 1 / 60):
-        # Двигаем по X и Y
-        self.center_x += self.change_x
-        self.center_y += self.change_y
-        self.change_y -= GRAVITY
-
-        # Проверка коллизий с платформами
-        hits = arcade.check_for_collision_with_list(self, platforms)
-        if hits:
-            # ставим игрока поверх платформы
-            for platform in hits:
-                if self.change_y <= 0:  # только если падали вниз
-                    self.bottom = platform.top
-                    self.change_y = 0
-                    self.can_jump = True
-        else:
-            self.can_jump = False
+            mask |= INPUT_LEFT
+        if keys[self.controls["right"]]:
+            mask |= INPUT_RIGHT
+        if keys[self.controls["jump"]]:
+            mask |= INPUT_JUMP
+        return mask
+
+    def sync(self, body, alpha: float = 1.0):
+        """Ставит спрайт туда, где тело было между двумя последними тиками."""
+        self.left = body.prev_left + (body.left - body.prev_left) * alpha
+        self.bottom = body.prev_bottom + (body.bottom - body.prev_bottom) * alpha
+        self.change_x = body.change_x
+        self.change_y = body.change_y
+        self.can_jump = body.can_jump
+
+
+class ViewRouter:
+    """Держит по одному экземпляру каждого экрана, чтобы переходы не пересоздавали виды.
+
+    show(MainMenuView) показывает уже созданное меню; параметры экрана
+    (уровень, экран под паузой) передаются в его configure(**kwargs).
+    """
+
+    def __init__(self, window: arcade.Window):
+        self.window = window
+        self._views = {}
+
+    def get(self, view_cls, **kwargs):
+        view = self._views.get(view_cls)
+        if view is None:
+            view = self._views[view_cls] = view_cls(**kwargs)
+        elif kwargs:
+            view.configure(**kwargs)
+        return view
+
+    def show(self, view_cls, **kwargs):
+        with frame_profiler.measure(f"view:{view_cls.__name__}"):
+            view = self.get(view_cls, **kwargs)
+            self.window.show_view(view)
+        return view
+
+    def forget(self, view_cls):
+        self._views.pop(view_cls, None)
+
+
+class FramePacer:
+    """Перерисовка по требованию для экранов с redraw_on_demand = True.
+
+    После события окна, смены экрана или wake() экран рисуется каждый кадр ещё
+    IDLE_AFTER секунд (подсветка и нажатие кнопок успевают дорисоваться). Дальше окно
+    тикает с IDLE_FRAME_RATE и не зовёт on_draw/flip — на экране остаётся последний
+    кадр. Остальные экраны (игра, загрузка) всегда идут с полной частотой.
+    """
+    # события окна, после которых картинка может измениться
+    WAKE_EVENTS = frozenset({
+        "on_mouse_motion", "on_mouse_press", "on_mouse_release", "on_mouse_drag",
+        "on_mouse_scroll", "on_mouse_enter", "on_mouse_leave", "on_key_press",
+        "on_key_release", "on_text", "on_resize", "on_expose", "on_activate", "on_show",
+    })
+
+    def __init__(self, window: arcade.Window):
+        self.window = window
+        self.on_demand = False
+        self.idle = False
+        self.quiet = 0.0     # секунд без событий
+        self.drawn = 0
+        self.skipped = 0
+
+    def view_changed(self, view: arcade.View):
+        self.on_demand = getattr(view, "redraw_on_demand", False)
+        self.wake()
+
+    def wake(self):
+        """Следующие IDLE_AFTER секунд рисовать каждый кадр с полной частотой."""
+        self.quiet = 0.0
+        if self.idle:
+            self.idle = False
+            self._set_rate(FRAME_RATE)
+
+    def should_draw(self, delta_time: float) -> bool:
+        if not self.on_demand or self.quiet <= IDLE_AFTER:
+            self.quiet += delta_time
+            self.drawn += 1
+            return True
+        if not self.idle:
+            self.idle = True
+            self._set_rate(IDLE_FRAME_RATE)
+        self.skipped += 1
+        return False
+
+    def _set_rate(self, rate: float):
+        # сначала update: draw не может быть чаще него
+        self.window.set_update_rate(rate)
+        self.window.set_draw_rate(rate)
+
+
+class GameWindow(arcade.Window):
+    """Окно игры: экраны меню перерисовываются только по требованию (см. FramePacer)."""
+    pacer = None
+
+    def __init__(self, width: int, height: int, title: str):
+        super().__init__(width, height, title, update_rate=FRAME_RATE, draw_rate=FRAME_RATE)
+        self.pacer = FramePacer(self)
+
+    def show_view(self, new_view: arcade.View):
+        super().show_view(new_view)
+        if self.pacer is not None:
+            self.pacer.view_changed(new_view)
+
+    def dispatch_event(self, event_type: str, *args):
+        if self.pacer is not None and event_type in FramePacer.WAKE_EVENTS:
+            self.pacer.wake()
+        return super().dispatch_event(event_type, *args)
+
+    def draw(self, dt: float):
+        if self.pacer is None or self.pacer.should_draw(dt):
+            super().draw(dt)
+
+
 class BaseUIView(arcade.View):
     """Базовый класс для всех экранов с UIManager'ом."""
+    redraw_on_demand = True
+
     def __init__(self):
+        import arcade.gui
+
         super().__init__()
         self.ui = arcade.gui.UIManager()
+        self._ui_built = False
+
+    def build_ui(self):
+        """Создаёт виджеты экрана. Вызывается один раз — при первом показе."""
 
     def on_show_view(self):
         self.ui.enable()
-        self.ui.clear()  # вместо устаревшего purge()
+        if not self._ui_built:
+            self.build_ui()
+            self._ui_built = True
 
     def on_hide_view(self):
         self.ui.disable()
@@ -194,78 +794,96 @@ class BaseUIView(arcade.View):
         self.clear()
         self.ui.draw()
 
-    def _anchor_center(self, widget: arcade.gui.UIWidget):
+    def _anchor_center(self, widget: "arcade.gui.UIWidget"):
         """Оборачиваем виджет в центрирующий AnchorLayout и добавляем в UI."""
         anchor = arcade.gui.UIAnchorLayout()
         anchor.add(widget, anchor_x="center_x", anchor_y="center_y")
         self.ui.add(anchor)
 
-class ImageButton(arcade.gui.UITextureButton):
-    def __init__(self, normal_texture: arcade.Texture, scale: float = 2.0, **kwargs):
-        super().__init__(texture=normal_texture, scale=scale, **kwargs)
-        self.normal_texture = normal_texture
+def image_button(normal_texture: arcade.Texture, scale: float = 2.0, **kwargs):
+    """Кнопка-картинка (функция, а не подкласс, чтобы arcade.gui не грузился раньше меню)."""
+    button = arcade.gui.UITextureButton(texture=normal_texture, scale=scale, **kwargs)
+    button.normal_texture = normal_texture
+    return button
 
 
 class SplashView(arcade.View):
+    redraw_on_demand = True
+
     def __init__(self):
         super().__init__()
         # Загружаем картинку заставки
-        self.background = arcade.load_texture("assets/Start.png")
-
-    def on_show_view(self):
-        super().on_show_view()
+        self.background = textures.get(ASSETS_DIR / "Start.png")
+        self._drawn = False
+        self._warming = False
+
+    def _warm_up(self):
+        # заставка уже на экране: теперь грузим текстуры меню и персонажей, атлас тайлов
+        # (если устарел — он пересобирается), отложенные модули и музыку — до первого
+        # кадра они бы только отнимали у него время
+        self._warming = True
+        textures.preload(PRELOAD_TEXTURES)
+        threading.Thread(target=textures.atlas, name="atlas-load", daemon=True).start()
+        threading.Thread(target=load_deferred_modules, name="deferred-imports", daemon=True).start()
         self.window.audio.play_music("assets/music/menu.mp3")
+
     def on_draw(self):
         rect = arcade.LBWH(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
 
         # ВАЖНО: сначала texture, потом rect
         arcade.draw_texture_rect(self.background, rect)
+        self._drawn = True
+
+    def on_update(self, delta_time: float):
+        if not self._drawn:
+            return
+        timer = getattr(self.window, "startup_timer", None)
+        if timer is not None:
+            timer.poll()
+        if not self._warming:
+            self._warm_up()
+
     def on_key_press(self, key, modifiers):
         # Переход в главное меню
-        menu = MainMenuView()
-        self.window.show_view(menu)
+        self.window.views.show(MainMenuView)
 
     def on_mouse_press(self, x, y, button, modifiers):
         # Переход в главное меню
-        menu = MainMenuView()
-        self.window.show_view(menu)
+        self.window.views.show(MainMenuView)
 
 class MainMenuView(BaseUIView):
     def __init__(self):
         super().__init__()
-        self.manager = arcade.gui.UIManager()
 
         # Загружаем фон
-        self.background = arcade.load_texture("C:/gamr/assets/background.png")
+        self.background = textures.get(ASSETS_DIR / "background.png")
 
         # Загружаем кнопки
-        self.play_texture = arcade.load_texture("C:/gamr/assets/bg.png")
-        self.settings_texture = arcade.load_texture("C:/gamr/assets/st.png")
-        self.exit_texture = arcade.load_texture("C:/gamr/assets/ex.png")
+        self.play_texture = textures.get(ASSETS_DIR / "bg.png")
+        self.settings_texture = textures.get(ASSETS_DIR / "st.png")
+        self.exit_texture = textures.get(ASSETS_DIR / "ex.png")
 
     def on_show_view(self):
-        self.manager.enable()
-        self.manager.clear()
         super().on_show_view()
         # Меню-музыка
         self.window.audio.play_music("assets/music/menu.mp3")
+
+    def build_ui(self):
         v_box = arcade.gui.UIBoxLayout(vertical=True, space_between=20)
 
-        play_btn = ImageButton(self.play_texture, scale=0.4)
-        settings_btn = ImageButton(self.settings_texture, scale=0.4)
-        exit_btn = ImageButton(self.exit_texture, scale=0.4)
+        play_btn = image_button(self.play_texture, scale=0.4)
+        settings_btn = image_button(self.settings_texture, scale=0.4)
+        exit_btn = image_button(self.exit_texture, scale=0.4)
 
-        play_btn.on_click = lambda e: self.window.show_view(LevelSelectView())
-        settings_btn.on_click = lambda e: self.window.show_view(SettingsView())
+        play_btn.on_click = lambda e: self.window.views.show(LevelSelectView)
+        settings_btn.on_click = lambda e: self.window.views.show(SettingsView)
         exit_btn.on_click = lambda e: arcade.exit()
 
         v_box.add(play_btn)
         v_box.add(settings_btn)
         v_box.add(exit_btn)
 
-        anchor = arcade.gui.UIAnchorLayout()
-        anchor.add(v_box, anchor_x="center_x", anchor_y="center_y")
-        self.manager.add(anchor)
+        self._anchor_center(v_box)
 
     def on_draw(self):
         self.clear()
@@ -277,49 +895,46 @@ class MainMenuView(BaseUIView):
         arcade.draw_texture_rect(self.background, rect)
 
         # Рисуем кнопки
-        self.manager.draw()
+        self.ui.draw()
 
 
 # ---------- ВЫБОР УРОВНЯ ----------
 class LevelSelectView(BaseUIView):
-    def __init__(self, return_to=None, bg_path="C:/gamr/assets/levels_bg.png"):
+    def __init__(self, return_to=None, bg_path=ASSETS_DIR / "Levels_bg.png"):
         super().__init__()
-        self.manager = arcade.gui.UIManager()
-        self.background = arcade.load_texture(bg_path)
+        self.background = textures.get(bg_path)
         self.return_to = return_to
 
-        # Сколько уровней показывать
-        try:
-            from fix import GameView
-            self.level_count = len(getattr(GameView, "LEVELS", [])) or 3
-        except Exception:
-            self.level_count = 3
+        # Сколько уровней показывать — по манифесту (levels/manifest.json)
+        self.level_count = level_count()
 
     def on_show_view(self):
         super().on_show_view()
-        self.manager.enable()
-        self.manager.clear()
         self.window.audio.play_music("assets/music/menu.mp3")
+        # пока игрок выбирает, готовим самый вероятный уровень
+        preloader = getattr(self.window, "preloader", None)
+        if preloader is not None:
+            preloader.preload(getattr(self.window, "next_level", 1))
+
+    def build_ui(self):
         v_box = arcade.gui.UIBoxLayout(space_between=10)
 
         # Заголовок
 
         # Кнопки уровней
-        from fix import GameView  # если в том же файле — убери
         for i in range(1, self.level_count + 1):
             btn = arcade.gui.UIFlatButton(text=f"Уровень {i}", width=300, height=50)
-            btn.on_click = (lambda e, lvl=i: self.window.show_view(GameView(level=lvl)))
+            btn.on_click = (lambda e, lvl=i: start_level(self.window, lvl))
             v_box.add(btn, space_around=(0, 0, 10, 0))
 
         # Кнопка "Назад"
         back = arcade.gui.UIFlatButton(text="Назад", width=300, height=50)
-        back.on_click = lambda e: self.window.show_view(self.return_to or MainMenuView())
+        back.on_click = lambda e: (self.window.show_view(self.return_to) if self.return_to
+                                   else self.window.views.show(MainMenuView))
         v_box.add(back, space_around=(20, 0, 0, 0))
 
         # Центрируем блок
-        anchor = arcade.gui.UIAnchorLayout()
-        anchor.add(v_box, anchor_x="center_x", anchor_y="center_y")
-        self.manager.add(anchor)
+        self._anchor_center(v_box)
 
     def on_draw(self):
         self.clear()
@@ -327,22 +942,16 @@ class LevelSelectView(BaseUIView):
         rect = arcade.LBWH(0, 0, self.window.width, self.window.height)
         arcade.draw_texture_rect(self.background, rect)
         # UI
-        self.manager.draw()
-
-    def on_hide_view(self):
-        self.manager.disable()
+        self.ui.draw()
 
 # ---------- НАСТРОЙКИ ----------
 class SettingsView(BaseUIView):
-    def __init__(self, return_to=None, bg_path="C:/gamr/assets/settings_bg.png"):
+    def __init__(self, return_to=None, bg_path=ASSETS_DIR / "settings_bg.png"):
         super().__init__()
         self.return_to = return_to
 
-        # UIManager для виджетов
-        self.manager = arcade.gui.UIManager()
-
         # Фон настроек
-        self.background = arcade.load_texture(bg_path)
+        self.background = textures.get(bg_path)
 
         # Кнопки
         self._btn_difficulty = None
@@ -359,16 +968,15 @@ class SettingsView(BaseUIView):
                 show_hints = True
             self.window.game_config = _Cfg()
 
-    # --- on_show_view: создаём и размещаем кнопки ---
     def on_show_view(self):
-        # если в BaseUIView что-то важно (например, hotkey ESC), можно оставить:
-        # super().on_show_view()
-
-        self.manager.enable()
-        self.manager.clear()
         super().on_show_view()
         # Меню-музыка
         self.window.audio.play_music("assets/music/menu.mp3")
+        self._ensure_config()
+        self._refresh_labels()
+
+    # --- build_ui: создаём и размещаем кнопки (один раз) ---
+    def build_ui(self):
         v_box = arcade.gui.UIBoxLayout(space_between=10)
 
 
@@ -388,12 +996,7 @@ class SettingsView(BaseUIView):
         self._btn_back.on_click = self._go_back
         v_box.add(self._btn_back, space_around=(12, 0, 0, 0))
 
-        anchor = arcade.gui.UIAnchorLayout()
-        anchor.add(v_box, anchor_x="center_x", anchor_y="center_y")
-        self.manager.add(anchor)
-
-        self._ensure_config()
-        self._refresh_labels()
+        self._anchor_center(v_box)
 
     # --- подписи на кнопках из конфига ---
     def _refresh_labels(self, *_):
@@ -413,14 +1016,7 @@ class SettingsView(BaseUIView):
         except ValueError:
             idx = 1
         cfg.difficulty = order[(idx + 1) % len(order)]
-
-        # если у тебя есть функция apply_config, вызовем её безопасно
-        if "apply_config" in globals():
-            try:
-                apply_config(cfg)
-            except Exception:
-                pass
-
+        # физику под новую сложность соберёт GameView.configure при запуске уровня
         self._refresh_labels()
 
     def _on_toggle_sound(self, *_):
@@ -438,12 +1034,12 @@ class SettingsView(BaseUIView):
         self._refresh_labels()
 
     def _go_back(self, *_):
-        if callable(self.return_to):
-            self.window.show_view(self.return_to())
-        elif isinstance(self.return_to, type) and issubclass(self.return_to, arcade.View):
+        if isinstance(self.return_to, type) and issubclass(self.return_to, arcade.View):
+            self.window.views.show(self.return_to)
+        elif callable(self.return_to):
             self.window.show_view(self.return_to())
         else:
-            self.window.show_view(MainMenuView())
+            self.window.views.show(MainMenuView)
 
     # --- рендеринг ---
     def on_draw(self):
@@ -451,23 +1047,24 @@ class SettingsView(BaseUIView):
         # фон растягиваем на весь экран — корректный способ для Arcade 3.3.2
         rect = arcade.LBWH(0, 0, self.window.width, self.window.height)
         arcade.draw_texture_rect(self.background, rect)
-        self.manager.draw()
-
-    def on_hide_view(self):
-        self.manager.disable()
+        self.ui.draw()
 
 # ---------- ПАУЗА ----------
-class PauseView(arcade.View):
+class PauseView(BaseUIView):
     def __init__(self, game_view):
         super().__init__()
         self.game_view = game_view
-        self.manager = arcade.gui.UIManager()
+        self.backdrop = None
+
+    def configure(self, game_view):
+        self.game_view = game_view
 
     def on_show_view(self):
-        self.manager.enable()
-        self.manager.clear()
         super().on_show_view()
+        capture_backdrop(self, self.game_view)
         self.window.audio.play_music("assets/music/pause.mp3")
+
+    def build_ui(self):
         v_box = arcade.gui.UIBoxLayout(space_between=10)
         v_box.add(arcade.gui.UILabel(text="ПАУЗА", font_size=22, bold=True))
 
@@ -476,54 +1073,73 @@ class PauseView(arcade.View):
         v_box.add(resume_btn)
 
         restart_btn = arcade.gui.UIFlatButton(text="Перезапуск уровня", width=300, height=50)
-        restart_btn.on_click = lambda e: self.window.show_view(GameView(level=self.game_view.level_num))
+        restart_btn.on_click = lambda e: self.window.views.show(GameView, level=self.game_view.level_num)
         v_box.add(restart_btn)
 
         menu_btn = arcade.gui.UIFlatButton(text="Главное меню", width=300, height=50)
-        menu_btn.on_click = lambda e: self.window.show_view(MainMenuView())
+        menu_btn.on_click = lambda e: self.window.views.show(MainMenuView)
         v_box.add(menu_btn)
 
-        anchor = arcade.gui.UIAnchorLayout()
-        anchor.add(v_box, anchor_x="center_x", anchor_y="center_y")
-        self.manager.add(anchor)
-
-    def on_hide_view(self):
-        self.manager.disable()
+        self._anchor_center(v_box)
 
     def on_draw(self):
-        # рисуем игру "под паузой"
-        self.game_view.on_draw()
-        arcade.draw_lrbt_rectangle_filled(0, SCREEN_WIDTH, 0, SCREEN_HEIGHT, (0, 0, 0, 150))
-        self.manager.draw()
+        # игра под паузой — снимок, сделанный при показе экрана, а не живая отрисовка
+        self.clear()
+        self.backdrop.draw()
+        self.ui.draw()
 
 
 
 # ---------- ПОБЕДА ----------
 class WinView(BaseUIView):
-    def __init__(self, level_num: int, has_next: bool = True):
+    TINT = (*arcade.color.DARK_SPRING_GREEN[:3], 190)
+
+    def __init__(self, level_num: int, has_next: bool = True, game_view=None):
         super().__init__()
         self.level_num = level_num
         self.has_next = has_next
+        self.game_view = game_view
+        self.backdrop = None
+        self._next_btn = None
+
+    def configure(self, level_num: int, has_next: bool = True, game_view=None):
+        self.level_num = level_num
+        self.has_next = has_next
+        self.game_view = game_view
 
     def on_show_view(self):
         super().on_show_view()
+        self._next_btn.visible = self.has_next
+        preloader = getattr(self.window, "preloader", None)
+        if self.has_next and preloader is not None:
+            preloader.preload(self.level_num + 1)
+        # снимаем кадр до смены фона: пустые места уровня остаются цвета игры
+        capture_backdrop(self, self.game_view, self.TINT)
         arcade.set_background_color(arcade.color.DARK_SPRING_GREEN)
         self.window.audio.play_music("assets/music/win.mp3")
+
+    def on_draw(self):
+        self.clear()
+        if self.backdrop is not None:
+            self.backdrop.draw()
+        self.ui.draw()
+
+    def build_ui(self):
         box = arcade.gui.UIBoxLayout(space_between=10)
         box.add(arcade.gui.UILabel(text="ПОБЕДА!", font_size=24, bold=True),
                 space_around=(0, 0, 12, 0))
 
-        if self.has_next:
-            next_btn = arcade.gui.UIFlatButton(text="Следующий уровень", width=300, height=50)
-            next_btn.on_click = lambda e: self.window.show_view(GameView(level=self.level_num + 1))
-            box.add(next_btn)
+        # кнопка есть всегда, прячется, если следующего уровня нет
+        self._next_btn = arcade.gui.UIFlatButton(text="Следующий уровень", width=300, height=50)
+        self._next_btn.on_click = lambda e: start_level(self.window, self.level_num + 1)
+        box.add(self._next_btn)
 
         level_select = arcade.gui.UIFlatButton(text="Выбор уровня", width=300, height=50)
-        level_select.on_click = lambda e: self.window.show_view(LevelSelectView())
+        level_select.on_click = lambda e: self.window.views.show(LevelSelectView)
         box.add(level_select)
 
         main_menu = arcade.gui.UIFlatButton(text="Главное меню", width=300, height=50)
-        main_menu.on_click = lambda e: self.window.show_view(MainMenuView())
+        main_menu.on_click = lambda e: self.window.views.show(MainMenuView)
         box.add(main_menu)
 
         self._anchor_center(box)
@@ -531,205 +1147,497 @@ class WinView(BaseUIView):
 
 # ---------- ПОРАЖЕНИЕ ----------
 class LoseView(BaseUIView):
-    def __init__(self, level_num: int):
+    TINT = (*arcade.color.DARK_RED[:3], 190)
+
+    def __init__(self, level_num: int, game_view=None):
         super().__init__()
         self.level_num = level_num
+        self.game_view = game_view
+        self.backdrop = None
+
+    def configure(self, level_num: int, game_view=None):
+        self.level_num = level_num
+        self.game_view = game_view
 
     def on_show_view(self):
         super().on_show_view()
+        # снимаем кадр до смены фона: пустые места уровня остаются цвета игры
+        capture_backdrop(self, self.game_view, self.TINT)
         arcade.set_background_color(arcade.color.DARK_RED)
         self.window.audio.play_music("assets/music/lose.mp3")
+
+    def on_draw(self):
+        self.clear()
+        if self.backdrop is not None:
+            self.backdrop.draw()
+        self.ui.draw()
+
+    def build_ui(self):
         box = arcade.gui.UIBoxLayout(space_between=10)
         box.add(arcade.gui.UILabel(text="ПОРАЖЕНИЕ", font_size=24, bold=True),
                 space_around=(0, 0, 12, 0))
 
         retry = arcade.gui.UIFlatButton(text="Заново", width=300, height=50)
-        retry.on_click = lambda e: self.window.show_view(GameView(level=self.level_num))
+        retry.on_click = lambda e: self.window.views.show(GameView, level=self.level_num)
         box.add(retry)
 
         main_menu = arcade.gui.UIFlatButton(text="Главное меню", width=300, height=50)
-        main_menu.on_click = lambda e: self.window.show_view(MainMenuView())
+        main_menu.on_click = lambda e: self.window.views.show(MainMenuView)
         box.add(main_menu)
 
         self._anchor_center(box)
 
 
+# ---------- ЗАГРУЗКА ----------
+class LoadingView(arcade.View):
+    """Показывается, если уровень выбран раньше, чем LevelPreloader его подготовил."""
+
+    def __init__(self, level_num: int):
+        super().__init__()
+        self.level_num = level_num
+        self.text = arcade.Text("", SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2 + 30, arcade.color.WHITE, 20,
+                                anchor_x="center")
+
+    def configure(self, level_num: int):
+        self.level_num = level_num
+
+    def on_update(self, delta_time: float):
+        preloader = getattr(self.window, "preloader", None)
+        if preloader is None or preloader.status(self.level_num) != "loading":
+            self.window.views.show(GameView, level=self.level_num)
+
+    def on_draw(self):
+        self.clear()
+        preloader = getattr(self.window, "preloader", None)
+        progress = preloader.progress(self.level_num) if preloader is not None else 1.0
+        self.text.text = f"Загрузка уровня {self.level_num}… {progress:.0%}"
+        self.text.draw()
+        left, bottom, width = SCREEN_WIDTH / 2 - 150, SCREEN_HEIGHT / 2 - 10, 300
+        arcade.draw_lrbt_rectangle_outline(left, left + width, bottom, bottom + 16, arcade.color.WHITE, 2)
+        if progress > 0:
+            arcade.draw_lrbt_rectangle_filled(left, left + width * progress, bottom, bottom + 16, arcade.color.WHITE)
+
+
 # === Игра ===
+class ProfilerOverlay:
+    """Таблица p50/p99 по фазам и график времени кадра (F3 — вкл/выкл, F4 — CSV)."""
+    REFRESH = 0.25          # секунд между обновлениями текста
+    GRAPH_HEIGHT = 80
+    GRAPH_MS = 33.3         # верх графика
+    FRAME_BUDGET_MS = 1000 / 60
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.text = arcade.Text("", 10, SCREEN_HEIGHT - 10, arcade.color.WHITE, 11,
+                                multiline=True, width=420, anchor_y="top", font_name="monospace")
+        self._refreshed = 0.0
+
+    def _refresh(self):
+        prof = self.profiler
+        p50, p99 = prof.stats()
+        lines = [f"{'кадр':<16}{p50:7.2f}{p99:8.2f} мс  (p50/p99)"]
+        for name in prof.samples:
+            p50, p99 = prof.stats(name)
+            lines.append(f"{name:<16}{p50:7.2f}{p99:8.2f}")
+        self.text.text = "\n".join(lines)
+
+    def draw(self):
+        now = time.perf_counter()
+        if now - self._refreshed >= self.REFRESH:
+            self._refresh()
+            self._refreshed = now
+        left, bottom = 10, SCREEN_HEIGHT - self.text.content_height - self.GRAPH_HEIGHT - 20
+        width = self.profiler.window
+        arcade.draw_lrbt_rectangle_filled(left, left + width, bottom, bottom + self.GRAPH_HEIGHT, (0, 0, 0, 160))
+        budget_y = bottom + self.GRAPH_HEIGHT * self.FRAME_BUDGET_MS / self.GRAPH_MS
+        arcade.draw_line(left, budget_y, left + width, budget_y, arcade.color.YELLOW, 1)
+        times = self.profiler.frame_times
+        if len(times) > 1:
+            scale = self.GRAPH_HEIGHT / self.GRAPH_MS
+            points = [(left + i, bottom + min(ms * scale, self.GRAPH_HEIGHT)) for i, ms in enumerate(times)]
+            arcade.draw_line_strip(points, arcade.color.LIGHT_GREEN, 1)
+        self.text.draw()
+
+
 class GameView(arcade.View):
+    """Отрисовка уровня поверх Simulation: вся игровая логика живёт в physics.py."""
+
+    def __init__(self, level=1, replay=None):
+        from physics import FixedStep, PhysicsConfig
 
-    def __init__(self, level=1):
         super().__init__()
         self.level_num = level
-        self.tile_map = None
+        self.level = None
+        self.sim = None
         cfg: GameConfig = getattr(self.window, "game_config", GameConfig())
-        apply_config(cfg)
+        self.physics = apply_config(cfg)
+        # запись/воспроизведение ввода (см. replay.py)
+        self.replay = ReplayPlayer(replay) if replay is not None else None
+        self.recorder = None
+        self._replay_started = 0.0
+        self.finished = False   # уровень или запись закончились, дальше не симулируем
+        if replay is not None:
+            self.physics = PhysicsConfig.for_difficulty(
+                replay.header.difficulty, tick_rate=replay.header.tick_rate, require_gems=REQUIRE_GEMS,
+                collision=replay.header.collision)
         self.players = arcade.SpriteList()
         self.fire = None
         self.water = None
-        # --- обработка клавиш ---
+        # --- обработка клавиш (подключается к окну только пока уровень на экране) ---
         self.keys = pyglet.window.key.KeyStateHandler()
-        self.window.push_handlers(self.keys)
 
         self.fire_gems = arcade.SpriteList()
         self.water_gems = arcade.SpriteList()
         self.hazards = arcade.SpriteList()
         self.doors = arcade.SpriteList()
         self.platforms = arcade.SpriteList()
-        self.setup_level()
+        self._gem_sprites = {}
+        self.static_layers = None
+        self.chunks = None    # LevelChunks, если карта больше окна
+        self.camera = None
+        self.profiler_overlay = None
+        self.clock = FixedStep(self.physics.tick_rate)
+        with frame_profiler.measure("setup_level"):
+            self.setup_level()
+
+    def configure(self, level: int):
+        """Запуск уровня на уже созданном виде (перезапуск, следующий уровень)."""
+        from physics import FixedStep
+
+        self.level_num = level
+        cfg: GameConfig = getattr(self.window, "game_config", GameConfig())
+        self.physics = apply_config(cfg)
+        self.clock = FixedStep(self.physics.tick_rate)
+        with frame_profiler.measure("setup_level"):
+            self.setup_level()
 
-    def can_jump(self, player):
-        # проверяем, стоит ли игрок на платформе
-        hits = arcade.check_for_collision_with_list(player, self.platforms)
-        return len(hits) > 0 or player.bottom <= 0
     def setup_level(self):
-        layer_options = {
-            "Platforms": {"use_spatial_hash": True},  # для коллизий
-            "Gems": {"use_spatial_hash": False},
-            "Hazards": {"use_spatial_hash": False},
-            "Doors": {"use_spatial_hash": False}
-        }
+        from physics import Body, Simulation
+
         self.players = arcade.SpriteList()
-        map_name = f"C:/gamr/lvl{self.level_num}.tmx"
-        tile_map = arcade.load_tilemap(map_name, scaling=1.5)
-        self.platforms = tile_map.sprite_lists.get("Platforms", arcade.SpriteList())
-        self.fire_gems = tile_map.sprite_lists.get("fire_gems", arcade.SpriteList())
-        self.water_gems = tile_map.sprite_lists.get("water_gems", arcade.SpriteList())
-        self.hazards = tile_map.sprite_lists.get("Hazards", arcade.SpriteList())
-        self.doors = tile_map.sprite_lists.get("Doors", arcade.SpriteList())
-        self.tile_map = arcade.load_tilemap(map_name, TILE_SCALING, layer_options)
-        self.scene = arcade.Scene.from_tilemap(self.tile_map)
+        # уровень мог быть подготовлен в фоне (LevelPreloader); иначе готовим здесь
+        preloader = getattr(self.window, "preloader", None)
+        prepared = preloader.take(self.level_num) if preloader is not None else None
+        if prepared is None:
+            prepared = prepare_level(self.level_num)
+        self.level = prepared.level
+        self.world_size = (self.level.width * self.level.tile_width * LEVEL_SCALING,
+                           self.level.height * self.level.tile_height * LEVEL_SCALING)
+        if self.world_size[0] > self.window.width or self.world_size[1] > self.window.height:
+            # большая карта: спрайты только у камеры, собираются по мере движения
+            self.chunks = LevelChunks(self.level, prepared.layout, LEVEL_SCALING)
+            self.camera = arcade.camera.Camera2D()
+            layers = {}
+        else:
+            self.chunks = None
+            self.camera = None
+            layers = build_level_sprites(self.level, LEVEL_SCALING, layout=prepared.layout)
+        self.platforms = layers.get("Platforms", arcade.SpriteList())
+        self.fire_gems = layers.get("fire_gems", arcade.SpriteList())
+        self.water_gems = layers.get("water_gems", arcade.SpriteList())
+        self.hazards = layers.get("Hazards", arcade.SpriteList())
+        self.doors = layers.get("Doors", arcade.SpriteList())
+        self.scene = arcade.Scene()
+        for name, sprite_list in layers.items():
+            self.scene.add_sprite_list(name, sprite_list=sprite_list)
+        if self.chunks is None:
+            self._bake_static(layers)
+        # кристаллы убираем по событиям симуляции: (слой, клетка) -> спрайт
+        self._gem_sprites = {
+            (name, sprite.properties["cell"]): sprite
+            for name in ("fire_gems", "water_gems")
+            for sprite in layers.get(name, ())
+        }
         FIRE_CONTROLS = {"left": arcade.key.A, "right": arcade.key.D, "jump": arcade.key.W}
         WATER_CONTROLS = {"left": arcade.key.LEFT, "right": arcade.key.RIGHT, "jump": arcade.key.UP}
-        spawn_fire = self.tile_map.object_lists["Fire_spawn"][0]
-        spawn_water = self.tile_map.object_lists["Water_spawn"][0]
+        # спавны исторически берутся в масштабе TILE_SCALING, а не LEVEL_SCALING
+        spawn_fire = self.level.spawn_point("Fire_spawn", TILE_SCALING)
+        spawn_water = self.level.spawn_point("Water_spawn", TILE_SCALING)
         # Fire
-        self.fire = Player("assets/sprites/water.png", 0.045, FIRE_CONTROLS)
-        self.fire.center_x = spawn_fire.shape[0]
-        self.fire.center_y = spawn_fire.shape[1]+self.fire.height / 2
+        self.fire = Player(SPRITES_DIR / "water.png", PLAYER_SCALE, FIRE_CONTROLS)
+        self.fire.center_x = spawn_fire[0]
+        self.fire.center_y = spawn_fire[1]+self.fire.height / 2
         self.players.append(self.fire)
 
         # Water
-        self.water = Player("assets/sprites/fire.png", 0.045, WATER_CONTROLS)
-        self.water.center_x = spawn_water.shape[0]
-        self.water.center_y = spawn_water.shape[1]+self.water.height / 2
+        self.water = Player(SPRITES_DIR / "fire.png", PLAYER_SCALE, WATER_CONTROLS)
+        self.water.center_x = spawn_water[0]
+        self.water.center_y = spawn_water[1]+self.water.height / 2
         self.players.append(self.water)
 
-        # Платформа для теста
-        hits = arcade.check_for_collision_with_list(self.fire, self.platforms)
-        if hits:
-            top = max(p.top for p in hits)
-            self.fire.bottom = top
-            self.fire.change_y = 0
+        # тела симуляции — хитбоксы спрайтов (в режиме повтора — из записи)
+        boxes = [(p.left, p.bottom, p.right - p.left, p.top - p.bottom) for p in self.players]
+        if self.replay is not None:
+            boxes = self.replay.replay.header.bodies
+        self.sim = Simulation(self.level, self.physics, scaling=LEVEL_SCALING, bodies=[Body(*b) for b in boxes])
+        self.clock.reset()
+        self.finished = False
+        self._sync_sprites(1.0)
+        self._follow_camera()
+        self._start_recording(boxes)
+
+    def _bake_static(self, layers):
+        size = (round(self.level.width * self.level.tile_width * LEVEL_SCALING),
+                round(self.level.height * self.level.tile_height * LEVEL_SCALING))
+        if self.static_layers is None or self.static_layers.size != size:
+            self.static_layers = StaticLayers(self.window.ctx, size)
+        self.static_layers.bake([sl for name, sl in layers.items() if name not in DYNAMIC_LAYERS])
+
+    def _start_recording(self, boxes):
+        self._stop_recording()
+        record_dir = getattr(self.window, "record_dir", None)
+        if record_dir is None or self.replay is not None:
+            return
+        record_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"lvl{self.level_num}-{time.strftime('%Y%m%d-%H%M%S')}"
+        header = ReplayHeader(self.level_num, self.physics.tick_rate, len(boxes),
+                              getattr(self.window, "game_config", GameConfig()).difficulty, list(boxes),
+                              self.physics.collision)
+        # «Заново» через долю секунды после начала — та же секунда в имени: добавляем номер
+        attempt = 1
+        while self.recorder is None:
+            name = f"{stem}.rep" if attempt == 1 else f"{stem}-{attempt}.rep"
+            try:
+                self.recorder = InputRecorder(record_dir / name, header)
+            except FileExistsError:
+                attempt += 1
+
+    def _stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def _finish_replay(self):
+        self.finished = True
+        header = self.replay.replay.header
+        frames = self.replay.index
+        wall = time.perf_counter() - self._replay_started
+        print(f"replay lvl{header.level}: {frames} кадров, {self.sim.tick} тиков, "
+              f"результат {self.sim.result or '-'}, {wall:.2f} с, "
+              f"{wall / max(frames, 1) * 1000:.2f} мс/кадр")
+        arcade.exit()
+
+    def _sync_sprites(self, alpha: float):
+        for player, body in zip(self.players, self.sim.bodies):
+            player.sync(body, alpha)
+
+    def _follow_camera(self):
+        """Камера — посередине между игроками, но не дальше краёв карты; заодно подгружает чанки."""
+        if self.chunks is None:
+            return
+        center = []
+        for axis, view in enumerate(self.window.get_size()):
+            world = self.world_size[axis]
+            target = sum(p.position[axis] for p in self.players) / len(self.players)
+            center.append(min(max(target, view / 2), world - view / 2) if world > view else world / 2)
+        self.camera.position = tuple(center)
+        self.chunks.stream(*self.camera_rect())
+
+    def camera_center(self):
+        """Мировая точка в центре экрана или None, если карта помещается в окно."""
+        return None if self.camera is None else tuple(self.camera.position)
+
+    def camera_rect(self) -> tuple:
+        x, y = self.camera.position
+        width, height = self.window.get_size()
+        return x - width / 2, y - height / 2, x + width / 2, y + height / 2
 
     def on_show_view(self):
 
         arcade.set_background_color(arcade.color.BLUE_SAPPHIRE)
 
         super().on_show_view()
+        self.keys.data.clear()
+        self.window.push_handlers(self.keys)
         self.window.audio.play_music("assets/music/game.mp3")
 
+    def on_hide_view(self):
+        self.window.remove_handlers(self.keys)
+
     def on_draw(self):
         self.clear()
-        self.platforms.draw()
-        self.fire_gems.draw()
-        self.water_gems.draw()
-        self.hazards.draw()
-        self.doors.draw()
-        self.players.draw()
+        prof = frame_profiler if frame_profiler.enabled else None
+        if prof is not None:
+            prof.mark()
+        if self.camera is None:
+            self.draw_scene(prof)
+        else:
+            self._sync_sprites(self.clock.alpha)
+            self._follow_camera()
+            if prof is not None:
+                prof.lap("camera")
+            with self.camera.activate():
+                self.draw_scene(prof)
 
         cfg: GameConfig = getattr(self.window, "game_config", GameConfig())
         if cfg.show_hints:
             arcade.draw_text("ESC — пауза", 10, 10, arcade.color.LIGHT_GRAY, 12)
+        if prof is not None:
+            prof.lap("draw_hud")
+            if self.profiler_overlay is None:
+                self.profiler_overlay = ProfilerOverlay(prof)
+            self.profiler_overlay.draw()
+            prof.mark()
+
+    def draw_scene(self, prof=None):
+        """Уровень и игроки без подсказок; оверлеи снимают этим же методом кадр в текстуру."""
+        if self.chunks is None:
+            self.static_layers.draw()
+        else:
+            self.chunks.draw_static()
+        if prof is not None:
+            prof.lap("draw_static")
+        if self.chunks is None:
+            self.fire_gems.draw()
+            self.water_gems.draw()
+        else:
+            self.chunks.draw_gems()
+        if prof is not None:
+            prof.lap("draw_gems")
 
-    def on_update(self, delta_time: float):
+        # игроков рисуем между двумя последними тиками физики
+        self._sync_sprites(self.clock.alpha)
+        self.players.draw()
+        if prof is not None:
+            prof.lap("draw_players")
 
-        # --- границы по X ---
-        for p in (self.fire, self.water):
-            if p.left < 0:
-                p.left = 0
-                p.change_x = 0
-            if p.right > SCREEN_WIDTH:
-                p.right = SCREEN_WIDTH
-                p.change_x = 0
-        for player in self.players:
-            player.update_movement(self.keys)
-
-        # --- обработка движения и коллизий ---
-        for player in self.players:
-            # --- гравитация ---
-            player.change_y -= GRAVITY
-
-            # --- движение по Y ---
-            player.center_y += player.change_y
-            hits = arcade.check_for_collision_with_list(player, self.platforms)
-
-            if hits:
-                for platform in hits:
-                    # падение сверху
-                    if player.change_y <= 0 and player.top > platform.top:
-                        player.bottom = platform.top
-                        player.change_y = 0
-                        player.can_jump = True
-                    # удар головой снизу
-                    elif player.change_y > 0 and player.bottom < platform.bottom:
-                        player.top = platform.bottom
-                        player.change_y = 0
-            else:
-                player.can_jump = False
-
-            # --- движение по X ---
-            player.center_x += player.change_x
-            hits = arcade.check_for_collision_with_list(player, self.platforms)
-
-            if hits:
-                for platform in hits:
-                    if player.change_x > 0:  # движение вправо
-                        if player.right > platform.left:
-                            player.right = platform.left
-                            player.change_x = 0
-                    elif player.change_x < 0:  # движение влево
-                        if player.left < platform.right:
-                            player.left = platform.right
-                            player.change_x = 0
-
-            # --- проверка пола ---
-            if player.bottom <= 0:
-                player.bottom = 0
-                player.change_y = 0
-                player.can_jump = True
-
-        # --- сбор предметов ---
-        for player in (self.fire, self.water):
-
-            for gem in arcade.check_for_collision_with_list(self.water, self.fire_gems):
-                gem.remove_from_sprite_lists()
-            for gem in arcade.check_for_collision_with_list(self.fire, self.water_gems):
-                gem.remove_from_sprite_lists()
-        for player in (self.fire, self.water):
-            if arcade.check_for_collision_with_list(player, self.hazards):
-                self.window.show_view(LoseView(self.level_num))
+    def on_update(self, delta_time: float):
+        prof = frame_profiler if frame_profiler.enabled else None
+        if prof is not None:
+            prof.begin_frame()
+        self.sim.profiler = prof
+        if self.finished:
+            return
+        recorded = None
+        if self.replay is not None:
+            if self.replay.index == 0:
+                self._replay_started = time.perf_counter()
+            frame = self.replay.next_frame()
+            if frame is None:
+                self._finish_replay()
                 return
-
-        # Проверка победы
-        for door in self.doors:
-            if arcade.check_for_collision(self.fire, door) and arcade.check_for_collision(self.water, door):
-                gems_done = (len(self.fire_gems) == 0 and len(self.water_gems) == 0) if REQUIRE_GEMS else True
-                if gems_done:
-                    self.window.show_view(WinView(self.level_num))
+            # время кадра и ввод по тикам берём из записи, а не из часов и клавиатуры
+            delta_time, recorded = frame
+        else:
+            inputs = tuple(player.input_mask(self.keys) for player in self.players)
+        if prof is not None:
+            prof.lap("keys")
+
+        if self.recorder is not None:
+            self.recorder.begin_frame(delta_time)
+        for i in range(self.clock.advance(delta_time)):
+            if recorded is not None:
+                inputs = recorded[i]
+            if self.recorder is not None:
+                self.recorder.tick(inputs)
+            events = self.sim.step(inputs)
+            if prof is not None:
+                prof.mark()
+            if not self.handle_events(events):
                 return
+            if prof is not None:
+                prof.lap("game_events")
+
+    def handle_events(self, events) -> bool:
+        """Применяет события тика к спрайтам и экранам. False — уровень закончился."""
+        from physics import GemCollected
+
+        for event in events:
+            if isinstance(event, GemCollected):
+                if self.chunks is not None:
+                    self.chunks.remove_gem(event.layer, event.cell)
+                    continue
+                sprite = self._gem_sprites.pop((event.layer, event.cell), None)
+                if sprite is not None:
+                    sprite.remove_from_sprite_lists()
+
+        result = self.sim.result
+        if result is None:
+            return True
+        self.finished = True
+        self._stop_recording()
+        if self.replay is not None:
+            self._finish_replay()
+        elif result == "lose":
+            self.window.views.show(LoseView, level_num=self.level_num, game_view=self)
+        else:
+            self.window.next_level = self.level_num + 1
+            self.window.views.show(WinView, level_num=self.level_num,
+                                  has_next=self.level_num < level_count(), game_view=self)
+        return False
+
     def on_key_press(self, key, modifiers):
         if key == arcade.key.ESCAPE:
-                    pause_view = PauseView(self)
-                    self.window.show_view(pause_view)
+                    self.window.views.show(PauseView, game_view=self)
+        elif key == arcade.key.F3:
+            print(f"profiler {'on' if frame_profiler.toggle() else 'off'}")
+        elif key == arcade.key.F4 and frame_profiler.rows:
+            path = Path(f"profile-{time.strftime('%Y%m%d-%H%M%S')}.csv")
+            print(f"profiler: {frame_profiler.write_csv(path)} кадров -> {path}")
 
 
 # === Запуск ===
-def main():
-    window = arcade.Window(1200, 900, "Главное меню с картинками")
-    menu = SplashView()
+class StartupTimer:
+    """Замер холодного старта до первого кадра заставки (--startup-time)."""
+
+    def __init__(self, t0: float = STARTUP_T0, exit_after: bool = True):
+        self.exit_after = exit_after
+        self.marks = [("старт модуля", t0)]
+        self.reported = False
+
+    def mark(self, name: str):
+        self.marks.append((name, time.perf_counter()))
+
+    def poll(self):
+        """Зовётся из on_update после первого on_draw: кадр уже прошёл flip() и виден."""
+        if not self.reported:
+            self.reported = True
+            self._report()
+
+    def _report(self):
+        self.mark("первый кадр заставки")
+        t0 = prev = self.marks[0][1]
+        for name, t in self.marks[1:]:
+            print(f"{name:<24}{(t - prev) * 1000:8.1f} мс  (всего {(t - t0) * 1000:.1f} мс)")
+            prev = t
+        if self.exit_after:
+            arcade.exit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Огонь и вода")
+    parser.add_argument("--record", metavar="DIR", help="записывать ввод каждого уровня в папку DIR")
+    parser.add_argument("--replay", metavar="FILE", help="воспроизвести запись ввода и выйти")
+    parser.add_argument("--profile", action="store_true", help="включить профайлер кадра с самого старта")
+    parser.add_argument("--profile-csv", metavar="FILE", help="при выходе записать замеры кадров в CSV")
+    parser.add_argument("--startup-time", action="store_true", help="замерить время до первого кадра заставки и выйти")
+    parser.add_argument("--tick-rate", type=int, metavar="HZ", help="частота тиков физики (по умолчанию 120)")
+    parser.add_argument("--collision", choices=("discrete", "swept"), default="discrete",
+                        help="swept — непрерывные коллизии, для редких тиков и медленных машин")
+    args = parser.parse_args(argv)
+    if args.profile or args.profile_csv:
+        frame_profiler.enabled = True
+    timer = StartupTimer() if args.startup_time else None
+    if timer is not None:
+        timer.mark("импорт модулей")
+
+    window = GameWindow(1200, 900, "Главное меню с картинками")
+    window.startup_timer = timer
+    if timer is not None:
+        timer.mark("окно")
     window.audio = AudioManager()
-    window.show_view(menu)
+    window.views = ViewRouter(window)
+    window.preloader = LevelPreloader()
+    window.record_dir = Path(args.record) if args.record else None
+    window.game_config = GameConfig(tick_rate=args.tick_rate, collision=args.collision)
+    if args.replay:
+        replay = load_replay(args.replay)
+        window.show_view(GameView(level=replay.header.level, replay=replay))
+    else:
+        window.show_view(SplashView())
     arcade.run()
+    if args.profile_csv:
+        print(f"profiler: {frame_profiler.write_csv(args.profile_csv)} кадров -> {args.profile_csv}")
 
 
 if __name__ == "__main__":
@@ -1,5 +1,13 @@
 # -*- mode: python ; coding: utf-8 -*-
+import sys
+from pathlib import Path
 
+sys.path.insert(0, SPECPATH)
+import bundle
+
+# Ассеты не кладём в datas: one-file exe распаковывал бы их во временную папку
+# при каждом запуске. Вместо этого рядом с exe собирается dist/assets.pak
+# (см. bundle.py), который игра открывает через mmap.
 
 a = Analysis(
     ['fix.py'],
@@ -36,3 +44,5 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
+
+bundle.build_bundle(Path(DISTPATH) / bundle.BUNDLE_NAME)
@@ -0,0 +1,42 @@
+"""Окно игры без дисплея — общая обвязка soak.py и bench.py.
+
+arcade 3.3 в headless-режиме (ARCADE_HEADLESS=1) не может импортировать arcade.gui:
+pyglet.input на Linux подключает XInput и ждёт модуль pyglet.window.xlib, который
+headless-pyglet не импортирует, а arcade.gui берёт arcade.ControllerManager, который
+arcade без дисплея не экспортирует. init() импортирует оба настоящих модуля заранее;
+нужна только библиотека libX11, X-сервер не нужен.
+"""
+import importlib
+import os
+
+
+def init():
+    """Включает headless-режим arcade; вызывать до импорта fix и arcade.gui."""
+    os.environ.setdefault("ARCADE_HEADLESS", "1")
+    import arcade
+
+    if not arcade.headless:
+        return
+    # pyglet.options["headless"] уже выставлен arcade, поэтому X-дисплей не открывается
+    importlib.import_module("pyglet.window.xlib")
+    from arcade.controller import ControllerManager
+
+    if not hasattr(arcade, "ControllerManager"):
+        arcade.ControllerManager = ControllerManager
+
+
+def open_window(title: str):
+    """GameWindow со всем, что main() вешает на окно; звук выключен, запись ввода — нет."""
+    init()
+    import fix
+
+    window = fix.GameWindow(fix.SCREEN_WIDTH, fix.SCREEN_HEIGHT, title)
+    # как pyglet.app.run(): события обрабатываются сразу, а не копятся в очереди окна
+    window._enable_event_queue = False
+    window.audio = fix.AudioManager()
+    window.audio.set_sound(False)
+    window.views = fix.ViewRouter(window)
+    window.preloader = fix.LevelPreloader()
+    window.record_dir = None
+    window.game_config = fix.GameConfig(sound_on=False)
+    return window
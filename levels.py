@@ -0,0 +1,445 @@
+"""Уровни: компилятор карт Tiled (.tmx/.tsx) в компактный JSON и их загрузка по манифесту.
+
+python levels.py проверяет каждую lvl*.tmx (обязательные слои, точки спавна, картинки
+тайлов) и пишет levels/<имя>.json плюс levels/manifest.json — список уровней по порядку
+с хешами исходников. Игра читает только манифест и скомпилированные уровни; XML
+разбирается заново, лишь если карта изменилась (хеш не совпал) — при разработке.
+Пути к картинкам в скомпилированных уровнях — ключи относительно папки игры
+("blocs/lvl1/lvl1.png"), как в архиве ассетов (bundle.py).
+"""
+import hashlib
+import json
+import re
+import sys
+import threading
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+LEVELS_DIR = BASE_DIR / "levels"
+MANIFEST_PATH = LEVELS_DIR / "manifest.json"
+MANIFEST_VERSION = 1
+MAP_PATTERN = "lvl*.tmx"
+REQUIRED_LAYERS = ("Platforms", "fire_gems", "water_gems", "Hazards", "Doors")
+REQUIRED_OBJECTS = ("Fire_spawn", "Water_spawn")
+# слои, твёрдые тайлы которых заранее склеиваются в прямоугольники для коллизий
+SOLID_LAYERS = ("Platforms",)
+
+# старшие биты gid в Tiled — флаги отражения, нам нужен только номер тайла
+_GID_MASK = 0x1FFFFFFF
+
+
+@dataclass
+class TileInfo:
+    image: str
+    width: int
+    height: int
+    properties: dict = field(default_factory=dict)
+
+
+@dataclass
+class MapObject:
+    name: str
+    x: float
+    y: float
+    width: float = 0.0
+    height: float = 0.0
+
+
+@dataclass
+class LevelData:
+    """Всё, что нужно игре от карты: тайловые слои, тайлы и объекты."""
+    name: str
+    width: int
+    height: int
+    tile_width: int
+    tile_height: int
+    tiles: dict = field(default_factory=dict)     # gid -> TileInfo
+    layers: dict = field(default_factory=dict)    # имя слоя -> список gid построчно, строка 0 сверху
+    objects: dict = field(default_factory=dict)   # имя слоя -> [MapObject]
+    rects: dict = field(default_factory=dict)     # имя слоя -> [(col, row, w, h)] в клетках, строка 0 сверху
+
+    def spawn_point(self, layer_name: str, scaling: float = 1.0):
+        """Точка спавна в координатах arcade (ось Y вверх), как её отдаёт load_tilemap."""
+        obj = self.objects[layer_name][0]
+        x = obj.x * scaling
+        y = (self.height * self.tile_height - obj.y) * scaling
+        return x, y
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "width": self.width,
+            "height": self.height,
+            "tile_width": self.tile_width,
+            "tile_height": self.tile_height,
+            "tiles": {str(gid): [t.image, t.width, t.height, t.properties] for gid, t in self.tiles.items()},
+            "layers": self.layers,
+            "objects": {name: [[o.name, o.x, o.y, o.width, o.height] for o in objs]
+                        for name, objs in self.objects.items()},
+            "rects": self.rects,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LevelData":
+        return cls(
+            name=data["name"],
+            width=data["width"],
+            height=data["height"],
+            tile_width=data["tile_width"],
+            tile_height=data["tile_height"],
+            tiles={int(gid): TileInfo(*info) for gid, info in data["tiles"].items()},
+            layers=data["layers"],
+            objects={name: [MapObject(*o) for o in objs] for name, objs in data["objects"].items()},
+            rects={name: [tuple(r) for r in rects] for name, rects in data["rects"].items()},
+        )
+
+
+def merge_rects(gids, width: int, height: int) -> list:
+    """Жадно склеивает непустые клетки слоя в как можно меньшее число прямоугольников.
+
+    Идём сверху вниз и слева направо: тянем прямоугольник вправо, пока клетки
+    заняты, потом вниз, пока вся его ширина занята. Результат — [(col, row, w, h)].
+    """
+    used = [False] * (width * height)
+
+    def free(r, c):
+        i = r * width + c
+        return gids[i] != 0 and not used[i]
+
+    rects = []
+    for row in range(height):
+        for col in range(width):
+            if not free(row, col):
+                continue
+            w = 1
+            while col + w < width and free(row, col + w):
+                w += 1
+            h = 1
+            while row + h < height and all(free(row + h, c) for c in range(col, col + w)):
+                h += 1
+            for r in range(row, row + h):
+                for c in range(col, col + w):
+                    used[r * width + c] = True
+            rects.append((col, row, w, h))
+    return rects
+
+
+def _resolve_image(source: str, base_dir: Path) -> str:
+    """Путь к картинке тайлсета. В картах встречаются пути вида ../Users/..., поэтому ищем и по имени в blocs/."""
+    candidate = (base_dir / source)
+    if candidate.exists():
+        return str(candidate.resolve())
+    name = Path(source).name
+    for found in (BASE_DIR / "blocs").rglob(name):
+        return str(found.resolve())
+    print(f"Warning, can't find image {source}")
+    return ""
+
+
+def _parse_properties(node) -> dict:
+    props = {}
+    if node is None:
+        return props
+    for prop in node.iter("property"):
+        props[prop.get("name")] = prop.get("value")
+    return props
+
+
+def _parse_tileset(node, firstgid: int, base_dir: Path, tiles: dict):
+    tile_w = int(node.get("tilewidth"))
+    tile_h = int(node.get("tileheight"))
+    set_props = _parse_properties(node.find("properties"))
+
+    image = node.find("image")
+    if image is not None:
+        # тайлсет из одной картинки (во всех наших картах это один тайл)
+        path = _resolve_image(image.get("source"), base_dir)
+        count = int(node.get("tilecount", 1))
+        for local_id in range(count):
+            tiles[firstgid + local_id] = TileInfo(path, tile_w, tile_h, dict(set_props))
+
+    for tile in node.findall("tile"):
+        gid = firstgid + int(tile.get("id"))
+        props = dict(set_props)
+        props.update(_parse_properties(tile.find("properties")))
+        tile_image = tile.find("image")
+        if tile_image is not None:
+            tiles[gid] = TileInfo(
+                _resolve_image(tile_image.get("source"), base_dir),
+                int(tile_image.get("width", tile_w)),
+                int(tile_image.get("height", tile_h)),
+                props,
+            )
+        elif gid in tiles:
+            tiles[gid].properties = props
+
+
+def _parse_csv(text: str) -> list:
+    return [int(v) & _GID_MASK for v in text.replace("\n", "").split(",") if v.strip()]
+
+
+def parse_tmx(path) -> tuple:
+    """Разбирает карту один раз. Возвращает (LevelData, список файлов-источников)."""
+    path = Path(path).resolve()
+    base_dir = path.parent
+    root = ET.parse(path).getroot()
+    sources = [path]
+
+    level = LevelData(
+        name=path.stem,
+        width=int(root.get("width")),
+        height=int(root.get("height")),
+        tile_width=int(root.get("tilewidth")),
+        tile_height=int(root.get("tileheight")),
+    )
+
+    for ts in root.findall("tileset"):
+        firstgid = int(ts.get("firstgid"))
+        source = ts.get("source")
+        if source:
+            tsx_path = (base_dir / source).resolve()
+            sources.append(tsx_path)
+            _parse_tileset(ET.parse(tsx_path).getroot(), firstgid, tsx_path.parent, level.tiles)
+        else:
+            _parse_tileset(ts, firstgid, base_dir, level.tiles)
+
+    layers = []
+    for layer in root.iter("layer"):
+        data = layer.find("data")
+        if data.get("encoding") != "csv":
+            raise ValueError(f"{path.name}: слой '{layer.get('name')}' должен быть в CSV")
+        layers.append((layer.get("name"), data))
+
+    # бесконечная карта Tiled хранит слои кусками <chunk x y width height>;
+    # склеиваем их в обычную сетку по общим границам, начало — в левом верхнем куске
+    origin_x = origin_y = 0
+    chunks = [chunk for _, data in layers for chunk in data.findall("chunk")]
+    if chunks:
+        origin_x = min(int(c.get("x")) for c in chunks)
+        origin_y = min(int(c.get("y")) for c in chunks)
+        level.width = max(int(c.get("x")) + int(c.get("width")) for c in chunks) - origin_x
+        level.height = max(int(c.get("y")) + int(c.get("height")) for c in chunks) - origin_y
+
+    for name, data in layers:
+        if not data.findall("chunk"):
+            level.layers[name] = _parse_csv(data.text)
+            continue
+        gids = [0] * (level.width * level.height)
+        for chunk in data.findall("chunk"):
+            x, y = int(chunk.get("x")) - origin_x, int(chunk.get("y")) - origin_y
+            width = int(chunk.get("width"))
+            values = _parse_csv(chunk.text)
+            for i in range(0, len(values), width):
+                start = (y + i // width) * level.width + x
+                gids[start:start + width] = values[i:i + width]
+        level.layers[name] = gids
+
+    for name in SOLID_LAYERS:
+        if name in level.layers:
+            level.rects[name] = merge_rects(level.layers[name], level.width, level.height)
+
+    shift_x, shift_y = origin_x * level.tile_width, origin_y * level.tile_height
+    for group in root.iter("objectgroup"):
+        level.objects[group.get("name")] = [
+            MapObject(
+                obj.get("name", ""),
+                float(obj.get("x", 0)) - shift_x,
+                float(obj.get("y", 0)) - shift_y,
+                float(obj.get("width", 0)),
+                float(obj.get("height", 0)),
+            )
+            for obj in group.findall("object")
+        ]
+
+    return level, sources
+
+
+class LevelError(ValueError):
+    """Карта не прошла проверку; problems — список всех найденных ошибок."""
+
+    def __init__(self, problems):
+        self.problems = list(problems)
+        super().__init__("\n".join(self.problems))
+
+
+def validate_level(level: LevelData, base_dir: Path = BASE_DIR) -> list:
+    """Ошибки карты: нет обязательных слоёв или спавнов, картинка тайла не нашлась или лежит вне папки игры."""
+    problems = []
+    cells = level.width * level.height
+    for name in REQUIRED_LAYERS:
+        if name not in level.layers:
+            problems.append(f"{level.name}: нет слоя '{name}'")
+    for name, gids in level.layers.items():
+        if len(gids) != cells:
+            problems.append(f"{level.name}: в слое '{name}' {len(gids)} клеток вместо {cells}")
+    for name in REQUIRED_OBJECTS:
+        if not level.objects.get(name):
+            problems.append(f"{level.name}: нет объекта '{name}'")
+    for gid, tile in sorted(level.tiles.items()):
+        if not tile.image:
+            problems.append(f"{level.name}: у тайла {gid} не найдена картинка")
+        elif _image_key(tile.image, base_dir) is None:
+            problems.append(f"{level.name}: картинка тайла {gid} вне папки игры: {tile.image}")
+    return problems
+
+
+def _image_key(image: str, base_dir: Path):
+    try:
+        return Path(image).resolve().relative_to(base_dir).as_posix()
+    except ValueError:
+        return None
+
+
+def find_maps(base_dir: Path = BASE_DIR) -> list:
+    """Карты lvl*.tmx по номеру: lvl2 раньше lvl10."""
+    def number(path):
+        digits = re.findall(r"\d+", path.stem)
+        return (int(digits[-1]) if digits else 0, path.stem)
+
+    return sorted(base_dir.glob(MAP_PATTERN), key=number)
+
+
+def _hash_sources(sources, base_dir: Path) -> dict:
+    return {
+        Path(p).resolve().relative_to(base_dir).as_posix(): hashlib.sha1(Path(p).read_bytes()).hexdigest()
+        for p in sources
+    }
+
+
+def _compile(base_dir: Path, out_dir: Path):
+    compiled, problems = [], []
+    for map_path in find_maps(base_dir):
+        level, sources = parse_tmx(map_path)
+        problems += validate_level(level, base_dir)
+        compiled.append((level, sources))
+    if not compiled:
+        problems.append(f"{base_dir}: нет ни одной карты {MAP_PATTERN}")
+    if problems:
+        raise LevelError(problems)
+
+    manifest = {"version": MANIFEST_VERSION, "levels": []}
+    for level, sources in compiled:
+        for tile in level.tiles.values():
+            tile.image = _image_key(tile.image, base_dir)
+        manifest["levels"].append({
+            "name": level.name,
+            "file": (out_dir / f"{level.name}.json").relative_to(base_dir).as_posix(),
+            "sources": _hash_sources(sources, base_dir),
+        })
+    return manifest, {level.name: level for level, _ in compiled}
+
+
+def _write(manifest: dict, compiled: dict, base_dir: Path, out_dir: Path):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for entry in manifest["levels"]:
+        data = json.dumps(compiled[entry["name"]].to_dict(), ensure_ascii=False, separators=(",", ":"))
+        (base_dir / entry["file"]).write_text(data, encoding="utf-8")
+    (out_dir / MANIFEST_PATH.name).write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+
+
+def compile_levels(base_dir: Path = BASE_DIR, out_dir: Path = LEVELS_DIR, write: bool = True) -> dict:
+    """Проверяет и компилирует все карты. Возвращает манифест; при ошибках — LevelError со всеми сразу."""
+    manifest, compiled = _compile(base_dir, out_dir)
+    if write:
+        _write(manifest, compiled, base_dir, out_dir)
+    return manifest
+
+
+def _read_bytes(path: Path):
+    # собранная игра читает из архива ассетов, иначе — с диска
+    import assets
+
+    data = assets.read_bundled(path)
+    return bytes(data) if data is not None else path.read_bytes()
+
+
+def _is_stale(manifest: dict) -> bool:
+    """Карты рядом есть, а манифест собран не из них (или не из всех)."""
+    maps = [p.name for p in find_maps()]
+    if not maps:
+        return False   # собранная игра: карт нет, верим манифесту
+    entries = manifest.get("levels", [])
+    if [f"{entry['name']}.tmx" for entry in entries] != maps:
+        return True
+    try:
+        return any(_hash_sources([BASE_DIR / key for key in entry["sources"]], BASE_DIR) != entry["sources"]
+                   for entry in entries)
+    except OSError:
+        return True
+
+
+# манифест и уже загруженные уровни этого процесса (грузятся и из фоновых потоков)
+_manifest = None
+_loaded = {}
+_lock = threading.Lock()
+
+
+def load_manifest() -> dict:
+    """Манифест уровней; при разработке перекомпилирует карты, если они изменились."""
+    global _manifest
+    with _lock:
+        if _manifest is None:
+            _manifest = _load_manifest()
+        return _manifest
+
+
+def _load_manifest() -> dict:
+    try:
+        manifest = json.loads(_read_bytes(MANIFEST_PATH).decode("utf-8"))
+        if manifest.get("version") != MANIFEST_VERSION:
+            manifest = None
+    except (OSError, ValueError):
+        manifest = None
+    if manifest is None or _is_stale(manifest):
+        manifest, compiled = _compile(BASE_DIR, LEVELS_DIR)
+        _loaded.update(compiled)
+        try:
+            _write(manifest, compiled, BASE_DIR, LEVELS_DIR)
+        except OSError:
+            pass   # папка только для чтения — уровни остаются в памяти
+    return manifest
+
+
+def level_names() -> list:
+    return [entry["name"] for entry in load_manifest()["levels"]]
+
+
+def level_count() -> int:
+    return len(load_manifest()["levels"])
+
+
+def load_level(level) -> LevelData:
+    """Скомпилированный уровень по номеру (с 1) или имени ("lvl1")."""
+    entries = load_manifest()["levels"]
+    if isinstance(level, int):
+        if not 1 <= level <= len(entries):
+            raise LevelError([f"нет уровня {level}: всего {len(entries)}"])
+        entry = entries[level - 1]
+    else:
+        entry = next((e for e in entries if e["name"] == level), None)
+        if entry is None:
+            raise LevelError([f"нет уровня '{level}'"])
+    name = entry["name"]
+    if name not in _loaded:
+        data = _read_bytes(BASE_DIR / entry["file"])
+        _loaded[name] = LevelData.from_dict(json.loads(data.decode("utf-8")))
+    return _loaded[name]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    try:
+        manifest = compile_levels(write="--check" not in argv)
+    except LevelError as exc:
+        for problem in exc.problems:
+            print(problem)
+        return 1
+    for entry in manifest["levels"]:
+        print(f"{entry['name']}: {entry['file']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
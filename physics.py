@@ -0,0 +1,785 @@
+"""Физика уровня без окна, GL и звука: коллизии по сетке (NumPy), фиксированный шаг и Simulation.
+
+Модуль не импортирует arcade, поэтому его можно гонять на безголовых CI-машинах
+тысячами тиков в секунду: soak-тесты, проверка уровней, замеры производительности.
+"""
+import math
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import NamedTuple
+
+import numpy as np
+
+# Биты ввода одного игрока за тик
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_JUMP = 4
+
+# Порядок тел в Simulation.bodies
+FIRE = 0
+WATER = 1
+
+# Кто какие кристаллы собирает (исторически «огонь» собирает water_gems и наоборот)
+GEM_OWNERS = {"fire_gems": WATER, "water_gems": FIRE}
+HAZARD_LAYER = "Hazards"
+DOOR_LAYER = "Doors"
+SPAWN_LAYERS = ("Fire_spawn", "Water_spawn")
+
+# Размер хитбокса персонажа (fire.png/water.png при scale=0.045), если спрайта нет
+PLAYER_BODY_SIZE = (36.0, 39.5)
+
+PHYSICS_TICK_RATE = 120
+BASE_FRAME_RATE = 60
+# "discrete" — сдвиг и выталкивание из пересечения (как было), "swept" — до первого касания
+COLLISION_MODES = ("discrete", "swept")
+# сколько раз тело может упереться и скользить дальше за один тик (пол + стена + угол)
+SWEEP_PASSES = 3
+# зазор/перекрытие меньше этого (в пикселях) считается касанием: ошибки округления
+# после right = left + width не должны ни останавливать тело, ни пропускать сквозь стену
+CONTACT_EPSILON = 1e-6
+# до стольких тел тик идёт по телам на Python-числах: на паре персонажей накладные
+# расходы вызовов NumPy в разы больше самой арифметики; векторный тик обгоняет от ~24 тел
+SCALAR_BODIES = 16
+
+# Значения зависят от сложности; скорости — в пикселях за кадр при 60 FPS
+DIFFICULTY_PRESETS = {
+    "Лёгкая": {"move_speed": 4, "jump_speed": 10, "gravity": 0.5},
+    "Нормальная": {"move_speed": 5, "jump_speed": 11, "gravity": 0.5},
+    "Сложная": {"move_speed": 6, "jump_speed": 12, "gravity": 0.5},
+}
+
+
+@dataclass
+class PhysicsConfig:
+    move_speed: float = 5
+    jump_speed: float = 11
+    gravity: float = 0.5
+    acceleration: float = 0.5   # как быстро разгоняется
+    friction: float = 0.1       # как быстро тормозит (0 = резкая остановка)
+    tick_rate: int = PHYSICS_TICK_RATE
+    base_frame_rate: int = BASE_FRAME_RATE
+    require_gems: bool = True
+    collision: str = "discrete"   # один из COLLISION_MODES
+
+    @classmethod
+    def for_difficulty(cls, difficulty: str, **overrides) -> "PhysicsConfig":
+        preset = DIFFICULTY_PRESETS.get(difficulty, DIFFICULTY_PRESETS["Нормальная"])
+        return cls(**{**preset, **overrides})
+
+
+class TileGrid:
+    """Сетка твёрдых клеток слоя Platforms, склеенных в прямоугольники.
+
+    rect_ids[row, col] — номер прямоугольника, покрывающего клетку, или -1.
+    Строка 0 внизу карты (ось Y вверх, как в arcade). Запрос по AABB смотрит
+    только перекрытые клетки и возвращает прямоугольники, а не отдельные тайлы,
+    поэтому стоимость не зависит от числа тайлов на уровне.
+    """
+
+    def __init__(self, rect_ids: np.ndarray, boxes: list, cell_width: float, cell_height: float):
+        self.rect_ids = rect_ids
+        self.boxes = boxes
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.rows, self.cols = rect_ids.shape
+        self.box_array = np.array(boxes, dtype=np.float64).reshape(-1, 4)
+
+    @classmethod
+    def from_level(cls, level, layer: str = "Platforms", scaling: float = 1.0) -> "TileGrid":
+        rects = level.rects.get(layer)
+        if rects is None:
+            from levels import merge_rects
+            gids = level.layers.get(layer, [0] * (level.width * level.height))
+            rects = merge_rects(gids, level.width, level.height)
+        cw = level.tile_width * scaling
+        ch = level.tile_height * scaling
+        rect_ids = np.full((level.height, level.width), -1, dtype=np.int32)
+        boxes = []
+        for index, (col, row, w, h) in enumerate(rects):
+            # в Tiled строка 0 сверху, у нас снизу
+            bottom_row = level.height - row - h
+            rect_ids[bottom_row:bottom_row + h, col:col + w] = index
+            boxes.append((col * cw, bottom_row * ch, (col + w) * cw, (bottom_row + h) * ch))
+        return cls(rect_ids, boxes, cw, ch)
+
+    def _span(self, low: float, high: float, size: float, count: int):
+        first = max(int(math.floor(low / size)), 0)
+        last = min(int(math.ceil(high / size)) - 1, count - 1)
+        return first, last
+
+    def overlapping(self, left: float, bottom: float, right: float, top: float) -> list:
+        """Прямоугольники (l, b, r, t), строго пересекающие AABB.
+
+        Порядок — порядок склейки: сверху вниз, слева направо, как у тайлов в SpriteList.
+        """
+        c0, c1 = self._span(left, right, self.cell_width, self.cols)
+        r0, r1 = self._span(bottom, top, self.cell_height, self.rows)
+        if c0 > c1 or r0 > r1:
+            return []
+        block = self.rect_ids[r0:r1 + 1, c0:c1 + 1]
+        # под телом единицы клеток: set быстрее np.unique, порядок тот же — по возрастанию
+        ids = sorted(set(block.ravel().tolist()))
+        if ids and ids[0] < 0:
+            del ids[0]
+        return [self.boxes[i] for i in ids]
+
+    def candidates(self, left, bottom, right, top) -> np.ndarray:
+        """overlapping() сразу для массива AABB: (n, k) номеров прямоугольников, -1 — пусто.
+
+        В каждой строке номера идут по возрастанию, как в overlapping(), поэтому
+        разрешение по слотам слева направо повторяет порядок обхода по одному телу.
+        """
+        cw, ch = self.cell_width, self.cell_height
+        c0 = np.maximum(np.floor(left / cw).astype(np.int64), 0)
+        c1 = np.minimum(np.ceil(right / cw).astype(np.int64) - 1, self.cols - 1)
+        r0 = np.maximum(np.floor(bottom / ch).astype(np.int64), 0)
+        r1 = np.minimum(np.ceil(top / ch).astype(np.int64) - 1, self.rows - 1)
+        count = len(c0)
+        if not count:
+            return np.empty((0, 0), dtype=np.int32)
+        span_c = int((c1 - c0).max()) + 1
+        span_r = int((r1 - r0).max()) + 1
+        if span_c <= 0 or span_r <= 0:
+            return np.empty((count, 0), dtype=np.int32)
+        cols = c0[:, None] + np.arange(span_c)
+        rows = r0[:, None] + np.arange(span_r)
+        inside = (rows <= r1[:, None])[:, :, None] & (cols <= c1[:, None])[:, None, :]
+        # за краем карты ячейки всё равно отброшены inside, индекс только не должен вылезти
+        ids = self.rect_ids[np.minimum(rows, self.rows - 1)[:, :, None],
+                            np.minimum(cols, self.cols - 1)[:, None, :]]
+        ids = np.where(inside, ids, -1).reshape(count, -1)
+        ids.sort(axis=1)
+        ids[:, 1:][ids[:, 1:] == ids[:, :-1]] = -1
+        return ids
+
+    def collide_y(self, store: "BodyStore"):
+        """Разрешает пересечения всех тел после сдвига по Y: приземление сверху или удар головой снизу.
+
+        Тело, которое ни с чем не пересекается, теряет can_jump.
+        """
+        bottom, height, change_y = store.bottom, store.height, store.change_y
+        ids = self.candidates(store.left, bottom, store.left + store.width, bottom + height)
+        for slot in range(ids.shape[1]):
+            index = ids[:, slot]
+            valid = index >= 0
+            if not valid.any():
+                continue
+            box = self.box_array[index]
+            bottom[:], change_y[:], store.can_jump[:] = _land_y(
+                np.where, bottom, height, change_y, store.can_jump, box[:, 1], box[:, 3], valid)
+        store.can_jump &= (ids >= 0).any(axis=1)
+
+    def collide_x(self, store: "BodyStore"):
+        """Разрешает пересечения всех тел после сдвига по X: упор в стену."""
+        left, width, change_x = store.left, store.width, store.change_x
+        ids = self.candidates(left, store.bottom, left + width, store.bottom + store.height)
+        for slot in range(ids.shape[1]):
+            index = ids[:, slot]
+            valid = index >= 0
+            if not valid.any():
+                continue
+            box = self.box_array[index]
+            left[:], change_x[:] = _push_x(np.where, left, width, change_x, box[:, 0], box[:, 2], valid)
+
+    def resolve_y(self, body) -> bool:
+        """collide_y() для одного тела (BodyRow). Возвращает False, если тело ни с чем не пересекается."""
+        boxes = self.overlapping(body.left, body.bottom, body.right, body.top)
+        if not boxes:
+            return False
+        for _, box_bottom, _, box_top in boxes:
+            body.bottom, body.change_y, body.can_jump = _land_y(
+                _pick, body.bottom, body.height, body.change_y, body.can_jump, box_bottom, box_top)
+        return True
+
+    def resolve_x(self, body):
+        """collide_x() для одного тела (BodyRow)."""
+        for box_left, _, box_right, _ in self.overlapping(body.left, body.bottom, body.right, body.top):
+            body.left, body.change_x = _push_x(_pick, body.left, body.width, body.change_x,
+                                               box_left, box_right)
+
+    def sweep(self, body, dx: float, dy: float) -> bool:
+        """Двигает тело на (dx, dy) до первого касания платформы и скользит остатком вдоль неё.
+
+        Время касания считается по всему вектору движения, поэтому тело не проскакивает
+        тонкие платформы при любой скорости и длине тика. Ящики, с которыми тело уже
+        пересекается в начале (утопленный спавн), не останавливают его. Скорость по оси
+        касания обнуляется. Возвращает True, если тело приземлилось.
+        """
+        landed = False
+        for _ in range(SWEEP_PASSES):
+            if not dx and not dy:
+                break
+            left, bottom = body.left, body.bottom
+            right, top = left + body.width, bottom + body.height
+            boxes = self.overlapping(min(left, left + dx), min(bottom, bottom + dy),
+                                     max(right, right + dx), max(top, top + dy))
+            hit_time, hit_box, hit_y = 1.0, None, False
+            eps = CONTACT_EPSILON
+            for box in boxes:
+                box_left, box_bottom, box_right, box_top = box
+                if (left < box_right - eps and right > box_left + eps
+                        and bottom < box_top - eps and top > box_bottom + eps):
+                    continue
+                x_entry, x_exit = _slab(left, right, box_left, box_right, dx)
+                y_entry, y_exit = _slab(bottom, top, box_bottom, box_top, dy)
+                entry, leave = max(x_entry, y_entry), min(x_exit, y_exit)
+                if entry >= leave or entry < 0.0 or entry > hit_time:
+                    continue
+                # при равном времени важнее пол: иначе стык двух платформ ловит тело сбоку
+                is_y = y_entry >= x_entry
+                if hit_box is None or entry < hit_time or (entry == hit_time and is_y and not hit_y):
+                    hit_time, hit_box, hit_y = entry, box, is_y
+
+            if hit_box is None:
+                body.left = left + dx
+                body.bottom = bottom + dy
+                break
+            box_left, box_bottom, box_right, box_top = hit_box
+            if hit_y:
+                body.left = left + dx * hit_time
+                if dy < 0:
+                    body.bottom = box_top
+                    landed = True
+                else:
+                    body.top = box_bottom
+                body.change_y = 0
+                dx, dy = dx * (1.0 - hit_time), 0.0
+            else:
+                body.bottom = bottom + dy * hit_time
+                if dx > 0:
+                    body.right = box_left
+                else:
+                    body.left = box_right
+                body.change_x = 0
+                dx, dy = 0.0, dy * (1.0 - hit_time)
+        return landed
+
+
+def _slab(low: float, high: float, box_low: float, box_high: float, delta: float):
+    """Доли движения (вход, выход), на которых отрезок [low, high] перекрывает [box_low, box_high] по оси."""
+    eps = CONTACT_EPSILON
+    if delta > 0:
+        gap = box_low - high
+        return (gap if gap < -eps else max(gap, 0.0)) / delta, (box_high - low) / delta
+    if delta < 0:
+        gap = low - box_high
+        return (gap if gap < -eps else max(gap, 0.0)) / -delta, (high - box_low) / -delta
+    if high <= box_low + eps or low >= box_high - eps:
+        return math.inf, -math.inf
+    return -math.inf, math.inf
+
+
+# Правила тика пишутся один раз для обоих путей Simulation.step(): where — np.where
+# для столбцов BodyStore или _pick для одного тела на Python-числах. Поэтому внутри
+# только арифметика, сравнения и & | ^ — они одинаково работают с bool и массивами.
+
+def _pick(condition, if_true, if_false):
+    """np.where для одного тела: скалярный путь не платит за вызовы NumPy."""
+    return if_true if condition else if_false
+
+
+def _walls_rule(where, left, width, change_x, world_width):
+    """Границы мира по X: тело за краем ставится к краю и теряет скорость. -> (left, change_x)"""
+    out = left < 0
+    left, change_x = where(out, 0, left), where(out, 0, change_x)
+    out = left + width > world_width
+    return where(out, world_width - width, left), where(out, 0, change_x)
+
+
+def _input_rule(where, mask, change_x, change_y, can_jump, cfg: PhysicsConfig, step: float):
+    """Ввод INPUT_*: разгон или трение, предел скорости, прыжок. -> (change_x, change_y, can_jump)"""
+    # --- Горизонтальное движение (влево важнее вправо) ---
+    # трение — плавное замедление
+    friction = cfg.friction * step
+    slowed = where(abs(change_x) > friction, change_x - where(change_x > 0, friction, -friction), 0.0)
+    change_x = where((mask & INPUT_LEFT) != 0, change_x - cfg.acceleration * step,
+                     where((mask & INPUT_RIGHT) != 0, change_x + cfg.acceleration * step, slowed))
+    # Ограничиваем максимальную скорость
+    change_x = where(change_x > cfg.move_speed, cfg.move_speed,
+                     where(change_x < -cfg.move_speed, -cfg.move_speed, change_x))
+
+    # --- Прыжок ---
+    jump = ((mask & INPUT_JUMP) != 0) & can_jump
+    # jump возможен только при can_jump, поэтому ^ снимает флаг у прыгнувших
+    return change_x, where(jump, cfg.jump_speed, change_y), can_jump ^ jump
+
+
+def _land_y(where, bottom, height, change_y, can_jump, box_bottom, box_top, hit=True):
+    """Один прямоугольник после сдвига по Y. -> (bottom, change_y, can_jump)
+
+    hit — пересекается ли тело с ним вообще (у векторного пути пустые слоты — False).
+    """
+    # падение сверху
+    fall = hit & (change_y <= 0) & (bottom + height > box_top)
+    # удар головой снизу
+    rise = hit & (change_y > 0) & (bottom < box_bottom)
+    bottom = where(fall, box_top, where(rise, box_bottom - height, bottom))
+    return bottom, where(fall | rise, 0, change_y), can_jump | fall
+
+
+def _push_x(where, left, width, change_x, box_left, box_right, hit=True):
+    """Один прямоугольник после сдвига по X: упор в стену. -> (left, change_x)"""
+    to_right = hit & (change_x > 0) & (left + width > box_left)
+    to_left = hit & (change_x < 0) & (left < box_right)
+    left = where(to_right, box_left - width, where(to_left, box_right, left))
+    return left, where(to_right | to_left, 0, change_x)
+
+
+def _floor_rule(where, bottom, change_y, can_jump):
+    """Пол мира на y = 0. -> (bottom, change_y, can_jump)"""
+    floor = bottom <= 0
+    return where(floor, 0, bottom), where(floor, 0, change_y), can_jump | floor
+
+
+class FixedStep:
+    """Аккумулятор фиксированного шага: переводит время кадра в целое число тиков физики.
+
+    Остаток (alpha) показывает, насколько отрисовка отстаёт от следующего тика,
+    и используется для интерполяции позиций между двумя последними тиками.
+    """
+
+    def __init__(self, tick_rate: int = 120, max_steps: int = 8):
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def advance(self, delta_time: float) -> int:
+        """Добавляет время кадра и возвращает, сколько тиков нужно выполнить (0 и больше)."""
+        self.accumulator += delta_time
+        steps = int(self.accumulator / self.dt)
+        if steps > self.max_steps:
+            # очень долгий кадр (загрузка, перетаскивание окна): не догоняем бесконечно
+            self.accumulator = 0.0
+            return self.max_steps
+        self.accumulator -= steps * self.dt
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        return min(self.accumulator / self.dt, 1.0)
+
+    def reset(self):
+        self.accumulator = 0.0
+
+
+class BodyStore:
+    """Тела мира структурой массивов: по NumPy-массиву на поле, строка — тело.
+
+    Simulation шагает все тела сразу векторными операциями; Body — только окно в строку.
+    """
+    FIELDS = ("left", "bottom", "width", "height", "change_x", "change_y",
+              "prev_left", "prev_bottom", "can_jump")
+    # поля, которые меняет тик (размеры тела постоянны)
+    STATE_FIELDS = ("left", "bottom", "change_x", "change_y", "prev_left", "prev_bottom", "can_jump")
+
+    def __init__(self):
+        for name in self.FIELDS:
+            setattr(self, name, np.empty(0, dtype=bool if name == "can_jump" else np.float64))
+
+    def __len__(self) -> int:
+        return len(self.left)
+
+    def add(self, left: float, bottom: float, width: float, height: float) -> int:
+        """Новая строка (тело стоит, прыгать не может). Возвращает её номер."""
+        values = {"left": left, "bottom": bottom, "width": width, "height": height,
+                  "prev_left": left, "prev_bottom": bottom}
+        # тела добавляются при загрузке уровня, а не каждый тик — копирование массивов не страшно
+        for name in self.FIELDS:
+            column = getattr(self, name)
+            setattr(self, name, np.append(column, np.array([values.get(name, 0)], dtype=column.dtype)))
+        return len(self) - 1
+
+    def rows(self) -> list:
+        """Все строки как BodyRow на Python-числах (копия; назад — store_rows)."""
+        columns = [getattr(self, name).tolist() for name in self.FIELDS]
+        rows = []
+        for values in zip(*columns):
+            row = BodyRow()
+            (row.left, row.bottom, row.width, row.height, row.change_x, row.change_y,
+             row.prev_left, row.prev_bottom, row.can_jump) = values
+            rows.append(row)
+        return rows
+
+    def store_rows(self, rows: list):
+        """Записывает назад поля STATE_FIELDS строк, полученных из rows()."""
+        for name in self.STATE_FIELDS:
+            getattr(self, name)[:] = list(map(attrgetter(name), rows))
+
+
+class _Box:
+    """right/top/overlaps поверх left/bottom/width/height."""
+    __slots__ = ()
+
+    @property
+    def right(self) -> float:
+        return self.left + self.width
+
+    @right.setter
+    def right(self, value: float):
+        self.left = value - self.width
+
+    @property
+    def top(self) -> float:
+        return self.bottom + self.height
+
+    @top.setter
+    def top(self, value: float):
+        self.bottom = value - self.height
+
+    def overlaps(self, box) -> bool:
+        left, bottom, right, top = box
+        return self.left < right and self.right > left and self.bottom < top and self.top > bottom
+
+
+class BodyRow(_Box):
+    """Копия строки BodyStore на Python-числах — для скалярного тика (SCALAR_BODIES)."""
+    __slots__ = BodyStore.FIELDS
+
+
+def _column(name: str):
+    def get(self):
+        return getattr(self._store, name)[self._index].item()
+
+    def set(self, value):
+        getattr(self._store, name)[self._index] = value
+
+    return property(get, set)
+
+
+class Body(_Box):
+    """AABB тела в мировых координатах (ось Y вверх) и его скорость — строка BodyStore.
+
+    Отдельно созданное тело держит своё хранилище на одну строку; Simulation переносит
+    его в общее (bind), и все ссылки на тело дальше видят общие массивы.
+    """
+    __slots__ = ("_store", "_index")
+
+    left = _column("left")
+    bottom = _column("bottom")
+    width = _column("width")
+    height = _column("height")
+    change_x = _column("change_x")
+    change_y = _column("change_y")
+    can_jump = _column("can_jump")
+    prev_left = _column("prev_left")
+    prev_bottom = _column("prev_bottom")
+
+    def __init__(self, left: float, bottom: float, width: float, height: float):
+        self._store = BodyStore()
+        self._index = self._store.add(left, bottom, width, height)
+
+    def bind(self, store: BodyStore):
+        """Переносит тело со всеми полями в store."""
+        old, index = self._store, self._index
+        self._store, self._index = store, store.add(0, 0, 0, 0)
+        for name in BodyStore.FIELDS:
+            getattr(store, name)[self._index] = getattr(old, name)[index]
+
+
+def layer_cells(level, layer: str, scaling: float = 1.0) -> dict:
+    """Непустые клетки тайлового слоя: индекс клетки в Tiled -> (l, b, r, t) в мире."""
+    cw = level.tile_width * scaling
+    ch = level.tile_height * scaling
+    cells = {}
+    for index, gid in enumerate(level.layers.get(layer, ())):
+        if gid:
+            row, col = divmod(index, level.width)
+            bottom = (level.height - row - 1) * ch
+            cells[index] = (col * cw, bottom, (col + 1) * cw, bottom + ch)
+    return cells
+
+
+# --- События тика ---
+class GemCollected(NamedTuple):
+    layer: str
+    cell: int
+    body: int
+
+
+class HazardTouched(NamedTuple):
+    cell: int
+    body: int
+
+
+class BothAtDoor(NamedTuple):
+    cell: int
+    complete: bool   # собраны ли все нужные кристаллы (тогда это победа)
+
+
+class TriggerIndex:
+    """Кристаллы, ловушки и двери уровня, проиндексированные по клетке карты.
+
+    Каждый такой тайл занимает ровно одну клетку, поэтому запрос по телу смотрит
+    только клетки под его AABB, а не весь слой. Счётчики оставшихся кристаллов
+    обновляются при сборе, а не пересчитываются.
+    """
+
+    def __init__(self, level, scaling: float = 1.0):
+        self.cols = level.width
+        self.rows = level.height
+        self.cell_width = level.tile_width * scaling
+        self.cell_height = level.tile_height * scaling
+        self.gems = {name: layer_cells(level, name, scaling) for name in GEM_OWNERS}
+        self.hazards = layer_cells(level, HAZARD_LAYER, scaling)
+        self.doors = layer_cells(level, DOOR_LAYER, scaling)
+        self.gems_left = {name: len(cells) for name, cells in self.gems.items()}
+        self.gems_remaining = sum(self.gems_left.values())
+
+    def cells(self, body) -> list:
+        """Номера клеток (как в Tiled: строка 0 сверху) под AABB тела, по возрастанию."""
+        c0 = max(int(math.floor(body.left / self.cell_width)), 0)
+        c1 = min(int(math.ceil(body.right / self.cell_width)) - 1, self.cols - 1)
+        r0 = max(int(math.floor(body.bottom / self.cell_height)), 0)
+        r1 = min(int(math.ceil(body.top / self.cell_height)) - 1, self.rows - 1)
+        if c0 > c1 or r0 > r1:
+            return []
+        # строки сетки считаются снизу, номера клеток — сверху
+        return [(self.rows - 1 - row) * self.cols + col
+                for row in range(r1, r0 - 1, -1) for col in range(c0, c1 + 1)]
+
+    def collect(self, layer: str, body, cells) -> list:
+        """Снимает кристаллы слоя под телом; возвращает номера собранных клеток."""
+        alive = self.gems[layer]
+        taken = [cell for cell in cells if cell in alive and body.overlaps(alive[cell])]
+        for cell in taken:
+            del alive[cell]
+        if taken:
+            self.gems_left[layer] -= len(taken)
+            self.gems_remaining -= len(taken)
+        return taken
+
+    def hazard(self, body, cells):
+        """Клетка ловушки, которой касается тело, или None."""
+        for cell in cells:
+            box = self.hazards.get(cell)
+            if box is not None and body.overlaps(box):
+                return cell
+        return None
+
+    def door(self, body, cells) -> list:
+        return [cell for cell in cells if cell in self.doors and body.overlaps(self.doors[cell])]
+
+
+class Simulation:
+    """Мир уровня: персонажи, прочие подвижные тела, платформы, кристаллы, ловушки и двери.
+
+    step() продвигает мир на один тик по битовым маскам ввода и возвращает
+    события тика: GemCollected, HazardTouched, BothAtDoor. Итог уровня — в result.
+    Тела из bodies — персонажи (ввод и триггеры); add_body() добавляет тела без
+    ввода (ящики, враги, падающие ловушки), которые только движутся и сталкиваются.
+    Все тела лежат в одном BodyStore и шагаются за один векторный проход; пока тел
+    не больше scalar_bodies (SCALAR_BODIES), тик идёт по телам на Python-числах (_step_rows) —
+    результат тот же до бита.
+    """
+
+    def __init__(self, level, config: PhysicsConfig = None, scaling: float = 1.0,
+                 bodies=None, spawn_scaling: float = 1.0):
+        self.level = level
+        self.config = config or PhysicsConfig()
+        if self.config.collision not in COLLISION_MODES:
+            raise ValueError(f"неизвестный режим коллизий: {self.config.collision}")
+        self.grid = TileGrid.from_level(level, "Platforms", scaling)
+        self.width = level.width * level.tile_width * scaling
+        self.triggers = TriggerIndex(level, scaling)
+        if bodies is None:
+            bodies = [self._spawn_body(name, spawn_scaling) for name in SPAWN_LAYERS]
+        self.store = BodyStore()
+        self.bodies = []
+        for body in bodies:
+            self._adopt(body)
+        self.player_count = len(self.bodies)
+        self.tick = 0
+        self.result = None   # "win" / "lose", когда уровень закончен
+        self.profiler = None  # profiler.FrameProfiler, пока идёт замер фаз тика
+        self.scalar_bodies = SCALAR_BODIES   # порог скалярного тика (simcheck.py сверяет оба пути)
+
+    def _spawn_body(self, layer: str, spawn_scaling: float) -> Body:
+        x, y = self.level.spawn_point(layer, spawn_scaling)
+        width, height = PLAYER_BODY_SIZE
+        return Body(x - width / 2, y, width, height)
+
+    def _adopt(self, body: Body) -> Body:
+        body.bind(self.store)
+        self.bodies.append(body)
+        self._settle(body)
+        return body
+
+    def add_body(self, left: float, bottom: float, width: float, height: float) -> Body:
+        """Подвижное тело без ввода и триггеров (ящик, враг). Возвращает его Body."""
+        return self._adopt(Body(left, bottom, width, height))
+
+    @property
+    def players(self) -> list:
+        return self.bodies[:self.player_count]
+
+    def _settle(self, body: Body):
+        # если спавн утоплен в платформу — ставим персонажа на неё
+        hits = self.grid.overlapping(body.left, body.bottom, body.right, body.top)
+        if hits:
+            body.bottom = max(box[3] for box in hits)
+            body.change_y = 0
+        body.prev_left, body.prev_bottom = body.left, body.bottom
+
+    @property
+    def step_scale(self) -> float:
+        """Длина тика в кадрах 60 FPS (0.5 при 120 Гц)."""
+        return self.config.base_frame_rate / self.config.tick_rate
+
+    def _apply_input(self, masks: np.ndarray, step: float):
+        store = self.store
+        store.change_x[:], store.change_y[:], store.can_jump[:] = _input_rule(
+            np.where, masks, store.change_x, store.change_y, store.can_jump, self.config, step)
+
+    def _move(self, step: float):
+        prof = self.profiler
+        store = self.store
+        # --- гравитация ---
+        store.change_y -= self.config.gravity * step
+        if prof is not None:
+            prof.lap("gravity")
+
+        if self.config.collision == "swept":
+            # по осям в том же порядке, что и дискретный режим: сначала Y, потом X,
+            # иначе угол уступа «ловит» тело, которое подпрыгивает мимо него
+            for body in self.bodies:
+                body.can_jump = self.grid.sweep(body, 0.0, body.change_y * step)
+                self.grid.sweep(body, body.change_x * step, 0.0)
+            if prof is not None:
+                prof.lap("sweep")
+            self._clamp_floor()
+            return
+
+        # --- движение по Y ---
+        store.bottom += store.change_y * step
+        self.grid.collide_y(store)
+        if prof is not None:
+            prof.lap("collide_y")
+
+        # --- движение по X ---
+        store.left += store.change_x * step
+        self.grid.collide_x(store)
+        if prof is not None:
+            prof.lap("collide_x")
+
+        self._clamp_floor()
+
+    def _clamp_floor(self):
+        # --- проверка пола ---
+        store = self.store
+        store.bottom[:], store.change_y[:], store.can_jump[:] = _floor_rule(
+            np.where, store.bottom, store.change_y, store.can_jump)
+
+    def _clamp_walls(self):
+        # --- границы по X ---
+        store = self.store
+        store.left[:], store.change_x[:] = _walls_rule(
+            np.where, store.left, store.width, store.change_x, self.width)
+
+    def _step_rows(self, inputs, step: float) -> list:
+        """Тик по телам на Python-числах: те же правила (_walls_rule, _input_rule...) в том же порядке.
+
+        Возвращает строки тел (BodyRow) после тика; в BodyStore они уже записаны.
+        """
+        cfg = self.config
+        prof = self.profiler
+        rows = self.store.rows()
+        for index, body in enumerate(rows):
+            body.prev_left, body.prev_bottom = body.left, body.bottom
+            body.left, body.change_x = _walls_rule(_pick, body.left, body.width, body.change_x, self.width)
+            mask = inputs[index] if index < len(inputs) else 0
+            body.change_x, body.change_y, body.can_jump = _input_rule(
+                _pick, mask, body.change_x, body.change_y, body.can_jump, cfg, step)
+        if prof is not None:
+            prof.lap("input")
+
+        # --- гравитация ---
+        for body in rows:
+            body.change_y -= cfg.gravity * step
+        if prof is not None:
+            prof.lap("gravity")
+
+        if cfg.collision == "swept":
+            for body in rows:
+                body.can_jump = self.grid.sweep(body, 0.0, body.change_y * step)
+                self.grid.sweep(body, body.change_x * step, 0.0)
+            if prof is not None:
+                prof.lap("sweep")
+        else:
+            for body in rows:
+                body.bottom += body.change_y * step
+                if not self.grid.resolve_y(body):
+                    body.can_jump = False
+            if prof is not None:
+                prof.lap("collide_y")
+            for body in rows:
+                body.left += body.change_x * step
+                self.grid.resolve_x(body)
+            if prof is not None:
+                prof.lap("collide_x")
+
+        # --- проверка пола ---
+        for body in rows:
+            body.bottom, body.change_y, body.can_jump = _floor_rule(
+                _pick, body.bottom, body.change_y, body.can_jump)
+        self.store.store_rows(rows)
+        return rows
+
+    def step(self, inputs=(0, 0)) -> list:
+        """Один тик. inputs — маски INPUT_* для персонажей по порядку (остальные тела без ввода)."""
+        if self.result is not None:
+            return []
+        step = self.step_scale
+        store = self.store
+        events = []
+        prof = self.profiler
+
+        if len(store) <= self.scalar_bodies:
+            # персонажи для триггеров — строки на Python-числах, а не окна в массивы
+            bodies = self._step_rows(inputs, step)[:self.player_count]
+        else:
+            store.prev_left[:] = store.left
+            store.prev_bottom[:] = store.bottom
+            self._clamp_walls()
+            masks = np.zeros(len(store), dtype=np.int64)
+            masks[:len(inputs)] = inputs
+            self._apply_input(masks, step)
+            if prof is not None:
+                prof.lap("input")
+            self._move(step)
+            bodies = self.players
+        self.tick += 1
+
+        # --- триггеры: только персонажи и только клетки под каждым ---
+        triggers = self.triggers
+        cells = [triggers.cells(body) for body in bodies]
+        for layer, owner in GEM_OWNERS.items():
+            for cell in triggers.collect(layer, bodies[owner], cells[owner]):
+                events.append(GemCollected(layer, cell, owner))
+        if prof is not None:
+            prof.lap("gems")
+
+        for index, body in enumerate(bodies):
+            cell = triggers.hazard(body, cells[index])
+            if cell is not None:
+                self.result = "lose"
+                events.append(HazardTouched(cell, index))
+                if prof is not None:
+                    prof.lap("hazards")
+                return events
+        if prof is not None:
+            prof.lap("hazards")
+
+        # Проверка победы: первая дверь, на которой стоят оба
+        shared = None
+        for index, body in enumerate(bodies):
+            doors = triggers.door(body, cells[index])
+            shared = doors if shared is None else [cell for cell in shared if cell in doors]
+        if shared:
+            complete = triggers.gems_remaining == 0 or not self.config.require_gems
+            if complete:
+                self.result = "win"
+            events.append(BothAtDoor(shared[0], complete))
+        if prof is not None:
+            prof.lap("doors")
+        return events
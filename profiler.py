@@ -0,0 +1,132 @@
+"""Покадровый профайлер: время фаз обновления и отрисовки, скользящие p50/p99 и выгрузка в CSV.
+
+Выключенный профайлер почти ничего не стоит: горячий код проверяет один атрибут
+(profiler.enabled или sim.profiler is None) и не зовёт таймер.
+
+Фазы кадра меряются «кругами»: lap(name) записывает время с предыдущей отметки
+в фазу name. Разовые события (загрузка уровня, смена экрана) — через measure(name).
+"""
+import csv
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+WINDOW = 300          # кадров в скользящем окне для p50/p99 и графика
+MAX_ROWS = 100_000    # кадров, хранящихся для выгрузки в CSV
+
+_NULL = nullcontext()
+
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * (len(ordered) - 1) + 0.5))]
+
+
+class FrameProfiler:
+    def __init__(self, window: int = WINDOW, max_rows: int = MAX_ROWS):
+        self.enabled = False
+        self.window = window
+        self.frame_times = deque(maxlen=window)   # мс между началами кадров
+        self.samples = {}                          # фаза/событие -> deque мс
+        self.rows = deque(maxlen=max_rows)         # (кадр, мс кадра, {фаза: мс}, [(событие, мс)])
+        self.frame = 0
+        self._phases = {}
+        self._events = []
+        self._frame_start = None
+        self._mark = 0
+
+    def toggle(self) -> bool:
+        self.enabled = not self.enabled
+        self._frame_start = None
+        return self.enabled
+
+    def reset(self):
+        self.frame_times.clear()
+        self.samples.clear()
+        self.rows.clear()
+        self.frame = 0
+        self._phases = {}
+        self._events = []
+        self._frame_start = None
+
+    # --- кадр ---
+    def begin_frame(self):
+        """Закрывает предыдущий кадр и начинает новый; зовётся в начале on_update."""
+        now = time.perf_counter_ns()
+        if self._frame_start is not None:
+            self._end_frame((now - self._frame_start) / 1e6)
+        self._frame_start = now
+        self._mark = now
+
+    def _end_frame(self, frame_ms: float):
+        self.frame += 1
+        self.frame_times.append(frame_ms)
+        for name, ms in self._phases.items():
+            self._sample(name, ms)
+        self.rows.append((self.frame, frame_ms, self._phases, self._events))
+        self._phases = {}
+        self._events = []
+
+    def mark(self):
+        """Ставит отметку без записи: время до неё ни в одну фазу не попадает."""
+        self._mark = time.perf_counter_ns()
+
+    def lap(self, name: str):
+        """Время с предыдущей отметки добавляется к фазе name текущего кадра."""
+        now = time.perf_counter_ns()
+        self._phases[name] = self._phases.get(name, 0.0) + (now - self._mark) / 1e6
+        self._mark = now
+
+    # --- разовые события ---
+    def measure(self, name: str):
+        """Контекстный менеджер для разовых замеров; при выключенном профайлере — пустой."""
+        if not self.enabled:
+            return _NULL
+        return self._measure(name)
+
+    @contextmanager
+    def _measure(self, name: str):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter_ns() - start) / 1e6
+            self._events.append((name, ms))
+            self._sample(name, ms)
+            # событие не должно попасть ещё и в фазу кадра
+            self._mark = time.perf_counter_ns()
+
+    def _sample(self, name: str, ms: float):
+        values = self.samples.get(name)
+        if values is None:
+            values = self.samples[name] = deque(maxlen=self.window)
+        values.append(ms)
+
+    # --- отчёты ---
+    def stats(self, name: str = None) -> tuple:
+        """(p50, p99) в мс для фазы/события или, без имени, для времени кадра."""
+        values = self.frame_times if name is None else self.samples.get(name, ())
+        return percentile(values, 0.5), percentile(values, 0.99)
+
+    def write_csv(self, path) -> int:
+        """Пишет накопленные кадры в CSV: кадр, время кадра, по столбцу на фазу, события. Возвращает число строк."""
+        phases = []
+        for _, _, row_phases, _ in self.rows:
+            for name in row_phases:
+                if name not in phases:
+                    phases.append(name)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "frame_ms", *phases, "events"])
+            for frame, frame_ms, row_phases, events in self.rows:
+                writer.writerow([
+                    frame, f"{frame_ms:.4f}",
+                    *(f"{row_phases[name]:.4f}" if name in row_phases else "" for name in phases),
+                    ";".join(f"{name}={ms:.3f}" for name, ms in events),
+                ])
+        return len(self.rows)
+
+
+frame_profiler = FrameProfiler()
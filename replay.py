@@ -0,0 +1,175 @@
+"""Запись и воспроизведение ввода игроков по тикам — для повторяемых прогонов и замеров.
+
+Формат файла (little-endian):
+    заголовок: b"GREP", версия u16, уровень u16, частота тиков u16, число игроков u8,
+               длина названия сложности u8 + само название в UTF-8,
+               с версии 2 за ней так же — режим коллизий (physics.COLLISION_MODES),
+               на каждого игрока стартовый AABB: left, bottom, width, height (4 x f64);
+    дальше кадры подряд: delta_time f64, число тиков u8, затем на каждый тик
+               по байту маски INPUT_* на каждого игрока.
+
+Файл только дописывается, поэтому оборванная запись остаётся читаемой до последнего кадра.
+Запуск без окна: python replay.py run.rep
+"""
+import struct
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+MAGIC = b"GREP"
+VERSION = 2
+_HEADER = struct.Struct("<4sHHHB")
+_FRAME = struct.Struct("<dB")
+_BODY = struct.Struct("<4d")
+
+
+@dataclass
+class ReplayHeader:
+    level: int
+    tick_rate: int
+    players: int = 2
+    difficulty: str = "Нормальная"
+    bodies: list = field(default_factory=list)   # [(left, bottom, width, height)]
+    collision: str = "discrete"
+
+
+@dataclass
+class Replay:
+    header: ReplayHeader
+    frames: list = field(default_factory=list)   # [(delta_time, [(mask, mask), ...])]
+
+    @property
+    def ticks(self) -> int:
+        return sum(len(ticks) for _, ticks in self.frames)
+
+    @property
+    def duration(self) -> float:
+        return sum(dt for dt, _ in self.frames)
+
+
+class InputRecorder:
+    """Пишет кадры в файл по мере игры: begin_frame(dt), затем tick(inputs) на каждый тик кадра.
+
+    Файл создаётся заново; если он уже есть — FileExistsError.
+    """
+
+    def __init__(self, path, header: ReplayHeader):
+        self.path = Path(path)
+        self.header = header
+        self._file = open(self.path, "xb")   # чужую запись не затираем: FileExistsError
+        self._file.write(_HEADER.pack(MAGIC, VERSION, header.level, header.tick_rate, header.players))
+        for text in (header.difficulty, header.collision):
+            name = text.encode("utf-8")
+            self._file.write(bytes([len(name)]) + name)
+        for body in header.bodies:
+            self._file.write(_BODY.pack(*body))
+        self._dt = None
+        self._ticks = bytearray()
+        self._count = 0
+
+    def begin_frame(self, delta_time: float):
+        self._flush_frame()
+        self._dt = delta_time
+
+    def tick(self, inputs):
+        self._ticks.extend(inputs)
+        self._count += 1
+
+    def _flush_frame(self):
+        if self._dt is None:
+            return
+        self._file.write(_FRAME.pack(self._dt, self._count))
+        self._file.write(self._ticks)
+        self._dt = None
+        self._ticks.clear()
+        self._count = 0
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._flush_frame()
+        self._file.close()
+
+
+def load_replay(path) -> Replay:
+    data = Path(path).read_bytes()
+    magic, version, level, tick_rate, players = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version not in (1, VERSION):
+        raise ValueError(f"{path}: не файл записи или неподдерживаемая версия")
+    offset = _HEADER.size
+    names = []
+    for _ in range(1 if version == 1 else 2):
+        name_len = data[offset]
+        names.append(data[offset + 1:offset + 1 + name_len].decode("utf-8"))
+        offset += 1 + name_len
+    difficulty, collision = (names + ["discrete"])[:2]
+    bodies = []
+    for _ in range(players):
+        bodies.append(_BODY.unpack_from(data, offset))
+        offset += _BODY.size
+
+    replay = Replay(ReplayHeader(level, tick_rate, players, difficulty, bodies, collision))
+    while offset + _FRAME.size <= len(data):
+        dt, count = _FRAME.unpack_from(data, offset)
+        offset += _FRAME.size
+        size = count * players
+        if offset + size > len(data):
+            break  # запись оборвалась посреди кадра
+        raw = data[offset:offset + size]
+        offset += size
+        replay.frames.append((dt, [tuple(raw[i:i + players]) for i in range(0, size, players)]))
+    return replay
+
+
+class ReplayPlayer:
+    """Отдаёт записанные кадры по одному: next_frame() -> (delta_time, [inputs на тик]) или None."""
+
+    def __init__(self, replay: Replay):
+        self.replay = replay
+        self.index = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.index >= len(self.replay.frames)
+
+    def next_frame(self):
+        if self.finished:
+            return None
+        frame = self.replay.frames[self.index]
+        self.index += 1
+        return frame
+
+
+def run_headless(replay: Replay, level_scaling: float = 1.5):
+    """Прогоняет запись через Simulation без окна. Возвращает (симуляция, время в секундах)."""
+    from levels import load_level
+    from physics import Body, PhysicsConfig, Simulation
+
+    header = replay.header
+    level = load_level(header.level)
+    config = PhysicsConfig.for_difficulty(header.difficulty, tick_rate=header.tick_rate,
+                                          collision=header.collision)
+    sim = Simulation(level, config, scaling=level_scaling, bodies=[Body(*b) for b in header.bodies])
+    start = time.perf_counter()
+    for _, ticks in replay.frames:
+        for inputs in ticks:
+            sim.step(inputs)
+    return sim, time.perf_counter() - start
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("usage: python replay.py FILE.rep")
+        return 2
+    replay = load_replay(argv[0])
+    sim, elapsed = run_headless(replay)
+    print(f"lvl{replay.header.level} {replay.header.difficulty}: {len(replay.frames)} кадров, "
+          f"{replay.ticks} тиков, {replay.duration:.2f} с игры, результат {sim.result or '-'}, "
+          f"{replay.ticks / elapsed if elapsed else 0:.0f} тиков/с")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Сверка двух путей тика Simulation: по телам на Python-числах и векторного по BodyStore.
+
+Путь выбирается по числу тел (Simulation.scalar_bodies), поэтому пути обязаны
+совпадать до бита: иначе игра вела бы себя по-разному в зависимости от того,
+сколько на уровне ящиков. Каждый прогон — случайный, но воспроизводимый по --seed
+уровень, режим коллизий, лишние тела и ввод; одна и та же сцена шагается дважды,
+и после каждого тика сравниваются события и байты всех столбцов BodyStore.
+При первом расхождении — отчёт и код выхода 1.
+
+    python simcheck.py [--runs 45] [--ticks 2000] [--seed 1]
+"""
+import argparse
+import random
+import sys
+
+from levels import level_count, load_level
+from physics import COLLISION_MODES, BodyStore, PhysicsConfig, Simulation
+
+LEVEL_SCALING = 1.5   # как fix.LEVEL_SCALING
+MAX_EXTRA_BODIES = 10  # вместе с двумя персонажами не больше physics.SCALAR_BODIES
+
+
+def scenario(rng: random.Random, ticks: int) -> dict:
+    """Параметры одного прогона: уровень, режим коллизий, лишние тела и маски ввода по тикам."""
+    level = rng.randint(1, level_count())
+    extra = [(rng.uniform(0, 1700), rng.uniform(0, 1300), rng.uniform(10, 40), rng.uniform(10, 40))
+             for _ in range(rng.randint(0, MAX_EXTRA_BODIES))]
+    inputs = []
+    while len(inputs) < ticks:
+        masks = (rng.randrange(8), rng.randrange(8))
+        inputs.extend([masks] * rng.randint(1, 90))
+    return {"level": level, "collision": rng.choice(COLLISION_MODES), "extra": extra,
+            "inputs": inputs[:ticks]}
+
+
+def simulation(params: dict, scalar_bodies: int) -> Simulation:
+    config = PhysicsConfig(collision=params["collision"], require_gems=False)
+    sim = Simulation(load_level(params["level"]), config, scaling=LEVEL_SCALING,
+                     spawn_scaling=LEVEL_SCALING)
+    for box in params["extra"]:
+        sim.add_body(*box)
+    sim.scalar_bodies = scalar_bodies
+    return sim
+
+
+def compare(params: dict):
+    """Шагает сцену обоими путями. Возвращает None или описание первого расхождения."""
+    scalar = simulation(params, scalar_bodies=len(params["extra"]) + 2)
+    vector = simulation(params, scalar_bodies=0)
+    for tick, inputs in enumerate(params["inputs"]):
+        events = scalar.step(inputs), vector.step(inputs)
+        if events[0] != events[1]:
+            return f"тик {tick}: события {events[0]} != {events[1]}"
+        for name in BodyStore.FIELDS:
+            a, b = getattr(scalar.store, name), getattr(vector.store, name)
+            if a.tobytes() != b.tobytes():
+                return f"тик {tick}: {name} {a.tolist()} != {b.tolist()}"
+        if scalar.result != vector.result:
+            return f"тик {tick}: итог {scalar.result} != {vector.result}"
+        # ловушка заканчивает уровень; сверяем дальше, как будто игрок выжил
+        scalar.result = vector.result = None
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Сверка скалярного и векторного тика физики")
+    parser.add_argument("--runs", type=int, default=45)
+    parser.add_argument("--ticks", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    for run in range(args.runs):
+        params = scenario(rng, args.ticks)
+        problem = compare(params)
+        label = (f"прогон {run + 1}: lvl{params['level']} {params['collision']}, "
+                 f"{len(params['extra']) + 2} тел")
+        if problem is not None:
+            print(f"{label}: РАСХОЖДЕНИЕ, {problem}")
+            return 1
+        print(f"{label}: совпадает", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""Soak-тест утечек: тысячи циклов меню → уровень → пауза → перезапуск → поражение → заново, без окна на экране.
+
+Цикл идёт через настоящие экраны, ViewRouter и события окна (нажатия клавиш,
+on_update/on_draw/flip), как в игре. Раз в --sample циклов после gc.collect()
+снимаются: Python-куча (tracemalloc), живые спрайты, текстуры, UIManager'ы и
+экраны, кэш TextureCache, GL-объекты контекста и глубина стека обработчиков окна.
+
+Первые --warmup циклов не считаются (кэши, ленивые импорты, пулы GL). Дальше рост
+кучи больше --max-heap-kb КБ на цикл или любого счётчика больше --max-objects
+на цикл — провал, код выхода 1.
+
+    python soak.py [--cycles 2000] [--warmup 20] [--sample 50] [--level 1]
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+
+import headless
+
+FRAME = 1 / 60
+GAME_FRAMES = 30      # кадров игры между переходами
+TRACE_FRAMES = 4      # глубина стека выделений в отчёте tracemalloc
+TOP_ALLOCATIONS = 10
+
+
+def count_objects(fix) -> dict:
+    """Число живых объектов, которые должны оставаться постоянными от цикла к циклу."""
+    import arcade
+    import arcade.gui
+
+    kinds = {
+        "sprites": arcade.BasicSprite,
+        "sprite_lists": arcade.SpriteList,
+        "textures": arcade.Texture,
+        "ui_managers": arcade.gui.UIManager,
+        "game_views": fix.GameView,
+        "views": arcade.View,
+    }
+    counts = dict.fromkeys(kinds, 0)
+    for obj in gc.get_objects():
+        for name, cls in kinds.items():
+            if isinstance(obj, cls):
+                counts[name] += 1
+    return counts
+
+
+def sample(window, fix) -> dict:
+    gc.collect()
+    # GL-объекты мёртвых Python-объектов освобождаются при flip(); не ждём его
+    window.ctx.gc()
+    stats = window.ctx.stats
+    # сначала счётчики: первый isinstance() по ABC-классам arcade заполняет кэши abc
+    # (~100 КБ), и куча до него дала бы разовую ступеньку между первым и вторым замером
+    counts = count_objects(fix)
+    row = {"heap_kb": tracemalloc.get_traced_memory()[0] / 1024}
+    row.update(counts)
+    row["cached_textures"] = len(fix.textures._items)
+    for name in ("texture", "framebuffer", "buffer", "vertex_array"):
+        created, freed = getattr(stats, name)
+        row[f"gl_{name}s"] = created - freed
+    row["handlers"] = len(window._event_stack)
+    return row
+
+
+class Soak:
+    """Сценарий одного цикла поверх окна игры."""
+
+    def __init__(self, window, fix, level: int):
+        self.window = window
+        self.fix = fix
+        self.level = level
+
+    def post(self, event: str, *args):
+        self.window.dispatch_event(event, *args)
+
+    def frames(self, count: int = 1):
+        for _ in range(count):
+            self.post("on_update", FRAME)
+            self.window.draw(FRAME)
+
+    def key(self, symbol: int):
+        self.post("on_key_press", symbol, 0)
+        self.frames()
+        self.post("on_key_release", symbol, 0)
+
+    def game(self):
+        view = self.window.current_view
+        if not isinstance(view, self.fix.GameView):
+            raise RuntimeError(f"ждали GameView, на экране {type(view).__name__}")
+        return view
+
+    def play(self):
+        import arcade
+
+        self.post("on_key_press", arcade.key.D, 0)
+        self.frames(GAME_FRAMES)
+        self.post("on_key_release", arcade.key.D, 0)
+
+    def lose(self):
+        """Ставит первого игрока на ловушку и ждёт экрана поражения."""
+        sim = self.game().sim
+        hazards = list(sim.triggers.hazards.values())
+        if hazards:
+            body = sim.bodies[0]
+            body.left, body.bottom = hazards[0][0], hazards[0][1]
+        else:
+            sim.result = "lose"
+        for _ in range(GAME_FRAMES):
+            self.frames()
+            if isinstance(self.window.current_view, self.fix.LoseView):
+                return
+        raise RuntimeError("не дождались экрана поражения")
+
+    def cycle(self, index: int):
+        import arcade
+
+        fix, views = self.fix, self.window.views
+        views.show(fix.MainMenuView)
+        self.frames(2)
+        if index % 10 == 0:
+            views.show(fix.SettingsView)
+            self.frames(2)
+        views.show(fix.LevelSelectView)
+        self.frames(2)
+        fix.start_level(self.window, self.level)
+        while not isinstance(self.window.current_view, fix.GameView):
+            self.frames()
+        self.play()
+        # пауза и «Перезапуск уровня»
+        self.key(arcade.key.ESCAPE)
+        self.frames(2)
+        views.show(fix.GameView, level=self.level)
+        self.play()
+        # поражение и «Заново»
+        self.lose()
+        self.frames(2)
+        views.show(fix.GameView, level=self.level)
+        self.play()
+
+
+def growth(rows: list) -> dict:
+    """Рост каждого счётчика на цикл — наклон прямой МНК по замерам [(номер цикла, замер)].
+
+    В отличие от разницы первого и последнего замера, не зависит от того, на какой
+    момент сборки мусора или разовой подгрузки (глифы шрифта) попал крайний замер.
+    """
+    xs = [done for done, _ in rows]
+    mean_x = sum(xs) / len(xs)
+    spread = sum((x - mean_x) ** 2 for x in xs) or 1.0
+    result = {}
+    for name in rows[0][1]:
+        ys = [row[name] for _, row in rows]
+        mean_y = sum(ys) / len(ys)
+        result[name] = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread
+    return result
+
+
+def run(cycles: int, warmup: int, sample_every: int, level: int):
+    """Гоняет циклы; после каждого замера отдаёт (номер цикла, замер, снимок tracemalloc).
+
+    Первый замер — сразу после прогрева.
+    """
+    window = headless.open_window("soak")
+    import fix
+
+    soak = Soak(window, fix, level)
+
+    tracemalloc.start(TRACE_FRAMES)
+    try:
+        for index in range(warmup):
+            soak.cycle(index)
+        yield warmup, sample(window, fix), tracemalloc.take_snapshot()
+        for index in range(warmup, warmup + cycles):
+            soak.cycle(index)
+            done = index + 1
+            if (done - warmup) % sample_every == 0 or done == warmup + cycles:
+                yield done, sample(window, fix), tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soak-тест утечек памяти при перезапусках уровня и смене экранов")
+    parser.add_argument("--cycles", type=int, default=2000, help="циклов после прогрева")
+    parser.add_argument("--warmup", type=int, default=20, help="циклов прогрева, которые не считаются")
+    parser.add_argument("--sample", type=int, default=50, help="замер раз в столько циклов")
+    parser.add_argument("--level", type=int, default=1)
+    parser.add_argument("--max-heap-kb", type=float, default=1.0, help="допустимый рост кучи, КБ на цикл")
+    parser.add_argument("--max-objects", type=float, default=0.01, help="допустимый рост счётчиков на цикл")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    rows, snapshots = [], []
+    for done, row, snapshot in run(args.cycles, args.warmup, args.sample, args.level):
+        rows.append((done, row))
+        snapshots = [snapshots[0] if snapshots else snapshot, snapshot]
+        print(f"цикл {done:6d}: " + ", ".join(f"{name} {value:.0f}" for name, value in row.items()), flush=True)
+
+    cycles = rows[-1][0] - rows[0][0]
+    per_cycle = growth(rows)
+    failed = [name for name, value in per_cycle.items()
+              if value > (args.max_heap_kb if name == "heap_kb" else args.max_objects)]
+    print(f"{cycles} циклов за {time.perf_counter() - start:.0f} с, рост на цикл:")
+    for name, value in per_cycle.items():
+        print(f"  {name:<16}{value:+10.3f}{'  ПРЕВЫШЕН' if name in failed else ''}")
+    if "heap_kb" in failed:
+        print("больше всего выросло:")
+        for stat in snapshots[1].compare_to(snapshots[0], "traceback")[:TOP_ALLOCATIONS]:
+            print(f"  {stat.size_diff / 1024:+8.1f} КБ, {stat.count_diff:+d} блоков")
+            for line in stat.traceback.format()[-2 * TRACE_FRAMES:]:
+                print(f"      {line}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""Уменьшенные копии больших спрайтов под тот масштаб, в котором их рисует игра.
+
+fire.png и water.png — 1024x1024, а на экране персонаж ~46px (масштаб 0.045). Вместо того
+чтобы держать в памяти и каждый кадр сэмплировать огромную текстуру, берём копию,
+уменьшенную в 2^k раз (k — наибольшее, при котором копия не меньше экранного размера),
+и рисуем её с масштабом 0.045 * 2^k.
+
+Хитбокс считается по исходнику и делится на 2^k — он совпадает с прежним до бита,
+поэтому физика и записи повторов не меняются. Точки лежат рядом с картинкой
+в <имя>.png.hitbox.json (его читает TextureCache).
+
+Копии лежат в assets/sprites/scaled/, собираются при первом запуске (и заново, если
+исходник изменился) или командой python sprites.py [--mipmaps].
+"""
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+from bundle import bundle_key
+
+BASE_DIR = Path(__file__).resolve().parent
+SPRITES_DIR = BASE_DIR / "assets" / "sprites"
+SCALED_DIR = SPRITES_DIR / "scaled"
+HIT_BOX_SUFFIX = ".hitbox.json"
+VARIANT_VERSION = 1
+PLAYER_SCALE = 0.045
+# исходник -> масштаб, в котором он рисуется
+SPRITE_SCALES = {
+    "assets/sprites/fire.png": PLAYER_SCALE,
+    "assets/sprites/water.png": PLAYER_SCALE,
+}
+
+_build_lock = threading.Lock()
+# (исходник, масштаб) -> (путь, во сколько раз уменьшена): копия, уже проверенная
+# или собранная в этом процессе; перезапуск уровня не ходит за ней на диск
+_variants = {}
+
+
+def mip_factor(scale: float) -> int:
+    """Во сколько раз (степень двойки) можно уменьшить картинку, не опустившись ниже экранного размера."""
+    factor = 1
+    while scale * factor * 2 <= 1:
+        factor *= 2
+    return factor
+
+
+def variant_path(source, factor: int) -> Path:
+    return SCALED_DIR / f"{Path(source).stem}@{factor}.png"
+
+
+def hit_box_path(image) -> Path:
+    image = Path(image)
+    return image.with_name(image.name + HIT_BOX_SUFFIX)
+
+
+def _read_meta(variant: Path):
+    try:
+        return json.loads(hit_box_path(variant).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def build_variant(source, factor: int, mipmaps: bool = False) -> Path:
+    """Пишет копию source, уменьшенную в factor раз, и её хитбокс. mipmaps — ещё и все
+    промежуточные уровни 2, 4, ... factor. Возвращает путь к копии нужного размера."""
+    import arcade
+    from PIL import Image
+
+    source = Path(source)
+    image = Image.open(source).convert("RGBA")
+    points = arcade.hitbox.algo_default.calculate(image)
+    meta = {
+        "version": VARIANT_VERSION,
+        "source": bundle_key(source),
+        "source_mtime_ns": os.stat(source).st_mtime_ns,
+    }
+    SCALED_DIR.mkdir(parents=True, exist_ok=True)
+    # уменьшение в предумноженной альфе, чтобы по краям не было тёмной каймы
+    level, step = image.convert("RGBa"), 1
+    while step < factor:
+        level, step = level.reduce(2), step * 2
+        if not mipmaps and step < factor:
+            continue
+        path = variant_path(source, step)
+        level.convert("RGBA").save(path, optimize=True)
+        hit_box = [[x / step, y / step] for x, y in points]
+        hit_box_path(path).write_text(
+            json.dumps({**meta, "factor": step, "points": hit_box}), encoding="utf-8")
+    return variant_path(source, factor)
+
+
+def _is_fresh(source: Path, variant: Path, factor: int) -> bool:
+    meta = _read_meta(variant)
+    if meta is None or meta.get("version") != VARIANT_VERSION or meta.get("factor") != factor:
+        return False
+    try:
+        return variant.exists() and meta["source_mtime_ns"] == os.stat(source).st_mtime_ns
+    except OSError:
+        return False
+
+
+def ensure_variant(source, scale: float):
+    """(путь к картинке, во сколько раз она уменьшена) для source в масштабе scale.
+    При необходимости собирает копию; если это невозможно — исходник как есть.
+    Проверка свежести делается один раз за процесс на (source, scale)."""
+    key = (str(source), scale)
+    result = _variants.get(key)
+    if result is None:
+        result = _find_variant(Path(source).resolve(), scale)
+        if result[1] != 1 or mip_factor(scale) == 1:
+            _variants[key] = result   # неудачную сборку попробуем ещё раз
+    return result
+
+
+def _find_variant(source: Path, scale: float):
+    from assets import bundle
+
+    factor = mip_factor(scale)
+    if factor == 1:
+        return source, 1
+    variant = variant_path(source, factor)
+    if bundle is not None and bundle_key(variant) in bundle:
+        return variant, factor
+    with _build_lock:
+        if _is_fresh(source, variant, factor):
+            return variant, factor
+        try:
+            return build_variant(source, factor), factor
+        except OSError as exc:
+            print(f"Warning, can't build scaled sprite for {source.name}: {exc}")
+            return source, 1
+
+
+def scaled_texture(source, scale: float):
+    """(текстура, масштаб спрайта) — уменьшенная копия вместо исходника, тот же размер на экране."""
+    from assets import textures
+
+    path, factor = ensure_variant(source, scale)
+    return textures.get(path), scale * factor
+
+
+def build_all(mipmaps: bool = False) -> list:
+    """Собирает копии для всех SPRITE_SCALES. Возвращает пути к ним."""
+    return [
+        build_variant(BASE_DIR / source, mip_factor(scale), mipmaps)
+        for source, scale in SPRITE_SCALES.items()
+    ]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    for path in build_all(mipmaps="--mipmaps" in argv):
+        print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())